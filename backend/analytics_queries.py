@@ -0,0 +1,57 @@
+"""
+Cross-event queries over the archived analytics in event_analytics.db.
+
+Every query is served from an index (see `_add_query_indexes` in
+event_analytics.py) and runs on the shared read connection, so it does not
+wait for an archival capture that is being written.
+"""
+from event_analytics import RANKABLE_METRICS, analytics_read_connection
+
+
+def percentile_rank(event_id, metric):
+    """Where an archived event stands among all archived events on `metric`
+
+    Returns None if the event has not been archived. The percentile counts
+    ties as half below, so the median event scores 50.
+    """
+    if metric not in RANKABLE_METRICS:
+        raise ValueError(f"metric must be one of: {', '.join(RANKABLE_METRICS)}")
+
+    with analytics_read_connection() as conn:
+        row = conn.execute(f'SELECT {metric} FROM events_analytics WHERE event_id = ?', (str(event_id),)).fetchone()
+        if row is None:
+            return None
+        value = row[0] or 0
+        below, equal = conn.execute(
+            f'SELECT '
+            f'(SELECT COUNT(*) FROM events_analytics WHERE {metric} < ?), '
+            f'(SELECT COUNT(*) FROM events_analytics WHERE {metric} = ?)',
+            (value, value)
+        ).fetchone()
+        total = conn.execute('SELECT COUNT(*) FROM events_analytics').fetchone()[0]
+
+    return {
+        'event_id': str(event_id),
+        'metric': metric,
+        'value': value,
+        'rank': total - below - equal + 1,  # 1 = best
+        'total_events': total,
+        'percentile': round((below + equal / 2) / total * 100, 2)
+    }
+
+
+def top_categories(limit=10):
+    """Q&A categories across all archived events, most asked first"""
+    with analytics_read_connection() as conn:
+        rows = conn.execute('''
+            SELECT category, question_count, vote_count, event_count
+            FROM qa_category_totals
+            WHERE event_count > 0
+            ORDER BY question_count DESC
+            LIMIT ?
+        ''', (limit,)).fetchall()
+
+    return [
+        {'category': category, 'questions': questions, 'votes': votes, 'events': events}
+        for category, questions, votes, events in rows
+    ]
@@ -1,19 +1,54 @@
-from flask import Flask, request, jsonify, render_template, redirect, session
+from flask import Flask, Response, request, jsonify, render_template, redirect, session
+from flask.helpers import get_debug_flag
 from flask_cors import CORS
 from datetime import datetime, timedelta
 import json
 import os
 import sqlite3
+import threading
+from engagement_log import EngagementLog
+from event_registry import EventRegistry, decode_cursor, encode_cursor
+from vote_counters import PollVoteCounters
+from sales_stream import SalesBroadcaster
+from engagement_versions import EngagementVersions
+from event_aggregates import EventAggregates
+from qa_ranking import QARankings, RANKING_ORDERS
+from engagement_store import EngagementStore
+from booking_store import BookingStore
+from booking_analytics import EventBookingColumns
+from idempotency import IdempotencyCache
+from seat_inventory import SeatInventory
+from job_queue import JobQueue
+from event_analytics import (capture_event_data_on_completion, init_event_analytics_db,
+                             load_timeline_rollups, write_timeline_rollups)
+from engagement_timeline import EngagementTimeline
+from dashboard_totals import DashboardTotals
+from analytics_queries import percentile_rank, top_categories
+from metrics import init_request_metrics, render_metrics, timed
 
 # File to store events persistently
 EVENTS_FILE = 'events_data.json'
 
 # Global variables for data storage
-events = []
+event_registry = EventRegistry()  # Events list plus id index; all lookups go through it
+events = event_registry.events
 engagement_data = {}  # Store engagement data per event
+engagement_store = EngagementStore()  # Per-event poll/question id indexes and id counters
+# Append-only log of engagement mutations; deletes are folded into the lists before each snapshot
+engagement_log = EngagementLog(before_snapshot=engagement_store.sync)
+poll_vote_counters = PollVoteCounters()  # Lock-striped poll vote counters
+engagement_versions = EngagementVersions()  # Per-event version, bumped on every engagement change
+event_aggregates = EventAggregates()  # Running engagement totals for post-event analytics
+qa_rankings = QARankings()  # Per-event top-question rankings by votes and by hot score
+# Per-minute engagement rollups, flushed to the engagement_timeline table in batches
+engagement_timeline = EngagementTimeline(writer=write_timeline_rollups, loader=load_timeline_rollups)
+
+# Upper bound for how long a long-poll request may hold a server thread
+LONG_POLL_MAX_TIMEOUT = 30
 tickets_data = {}     # Store ticket sales per event
 
 # Load events from file
+@timed('load_events')
 def load_events():
     if os.path.exists(EVENTS_FILE):
         try:
@@ -24,28 +59,43 @@ def load_events():
     return []
 
 # Save events to file
+@timed('save_events')
 def save_events(events_data):
     with open(EVENTS_FILE, 'w') as f:
         json.dump(events_data, f, indent=2)
 
-# In-memory storage for ticket bookings (in production, use a database)
-ticket_bookings = []
-live_sales_data = {
-    'total_sales': 0,
-    'total_revenue': 0,
-    'recent_bookings': []
-}
+# Durable storage for ticket bookings; live sales counters are seeded from it
+booking_store = BookingStore()
+live_sales_data = booking_store.live_sales_summary()
+live_sales_lock = threading.Lock()
+booking_idempotency = IdempotencyCache()  # Recent Idempotency-Key values and their booking responses
+# Per-event columnar bookings for pre-event reports, loaded on first report
+event_booking_columns = EventBookingColumns(loader=lambda event_id: booking_store.load_columns(event_id=event_id))
+
+# Largest number of bookings accepted by one /api/book-tickets call
+MAX_BOOKING_BATCH = 1000
+sales_broadcaster = SalesBroadcaster()  # Pushes each booking to /api/live-sales/stream subscribers
+seat_inventory = SeatInventory()  # Per-event seat counters; bookings reserve a seat before they are stored
+dashboard_totals = DashboardTotals()  # Running event/attendee/revenue totals for /api/dashboard
+
+job_queue = JobQueue()  # Background workers for post-event archival; jobs persist in data/jobs.db
+
+def load_seat_inventory():
+    """Rebuild seat counts from the events and stored bookings, and sync attendee numbers"""
+    seat_inventory.load(events, booking_store.counts_by_event())
+    dashboard_totals.rebuild(events)
 
 app = Flask(__name__, template_folder='../templates', static_folder='../static')
 app.secret_key = 'your-secret-key-here'  # Change this in production
 CORS(app)
+init_request_metrics(app)  # Per-route latency, counts and in-flight requests for /metrics
 
 # Load events data
-events = load_events()
+event_registry.load(load_events())
 
 # If no events exist, create some sample data
 if not events:
-    events = [
+    event_registry.load([
         {
             'id': 1,
             'title': 'Tech Conference 2024',
@@ -76,9 +126,11 @@ if not events:
             'status': 'upcoming',
             'created_at': datetime.now().isoformat()
         }
-    ]
+    ])
     save_events(events)
 
+load_seat_inventory()
+
 @app.route('/', methods=['GET'])
 def home():
     """Serve the home page with login"""
@@ -134,7 +186,7 @@ def logout():
 @app.route('/events/<int:event_id>/pre-event')
 def event_pre_analytics(event_id):
     """Pre-event analytics page"""
-    event = next((e for e in events if e['id'] == event_id), None)
+    event = event_registry.get(event_id)
     if not event:
         return redirect('/events')
     
@@ -147,7 +199,7 @@ def event_pre_analytics(event_id):
 @app.route('/events/<int:event_id>/engagement')
 def event_engagement_analytics(event_id):
     """Event engagement analytics page"""
-    event = next((e for e in events if e['id'] == event_id), None)
+    event = event_registry.get(event_id)
     if not event:
         return redirect('/events')
     
@@ -160,7 +212,7 @@ def event_engagement_analytics(event_id):
 @app.route('/events/<int:event_id>/post-event')
 def event_post_analytics(event_id):
     """Post-event analytics page"""
-    event = next((e for e in events if e['id'] == event_id), None)
+    event = event_registry.get(event_id)
     if not event:
         return redirect('/events')
     
@@ -173,7 +225,7 @@ def event_post_analytics(event_id):
 @app.route('/events/<int:event_id>/post-analytics')
 def event_post_analytics_alt(event_id):
     """Alternative route for post-event analytics page"""
-    event = next((e for e in events if e['id'] == event_id), None)
+    event = event_registry.get(event_id)
     if not event:
         return redirect('/events')
     
@@ -185,37 +237,171 @@ def event_post_analytics_alt(event_id):
 
 @app.route('/api/book-ticket', methods=['POST'])
 def book_ticket():
-    """API endpoint for booking tickets"""
+    """API endpoint for booking tickets
+    
+    Retries that repeat the `Idempotency-Key` header get the original response
+    instead of creating (and counting) another booking.
+    """
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if idempotency_key:
+        is_owner, cached_response = booking_idempotency.begin(idempotency_key)
+        if not is_owner:
+            if cached_response is None:
+                return jsonify({'success': False, 'error': 'A request with this Idempotency-Key is still in progress'}), 409
+            body, status = cached_response
+            return jsonify(body), status, {'Idempotent-Replayed': 'true'}
+    
     try:
         data = request.get_json()
         
-        booking = {
-            'id': len(ticket_bookings) + 1,
-            'event_id': data.get('event_id'),
-            'attendee_name': data.get('attendee_name'),
-            'attendee_email': data.get('attendee_email'),
-            'ticket_price': data.get('ticket_price', 250000),
-            'currency': data.get('currency', 'INR'),
-            'booking_time': datetime.now().isoformat(),
-            'status': 'confirmed'
-        }
+        error = validate_booking_data(data)
+        if error:
+            raise ValueError(error)
         
-        ticket_bookings.append(booking)
+        event = event_registry.get(data['event_id'])
+        if not event:
+            if idempotency_key:
+                booking_idempotency.abort(idempotency_key)
+            return jsonify({'success': False, 'error': 'Event not found'}), 404
         
-        # Update live sales data
-        live_sales_data['total_sales'] += 1
-        live_sales_data['total_revenue'] += booking['ticket_price']
-        live_sales_data['recent_bookings'].insert(0, booking)
+        # Hold a seat first so concurrent bookings can never oversell the event
+        reservation = seat_inventory.reserve(event['id'])
+        if reservation is None:
+            if idempotency_key:
+                booking_idempotency.abort(idempotency_key)
+            return jsonify({'success': False, 'error': 'Sold out'}), 409
+        
+        booking = build_booking(data)
+        try:
+            booking = {'id': booking_store.add(booking), **booking}
+        except Exception:
+            seat_inventory.release(reservation)
+            raise
+        sold = seat_inventory.commit(reservation)
+        engagement_timeline.record(event['id'], 'attendance_change', sold)
+        dashboard_totals.record_sale(event)
         
-        # Keep only last 10 recent bookings
-        if len(live_sales_data['recent_bookings']) > 10:
-            live_sales_data['recent_bookings'] = live_sales_data['recent_bookings'][:10]
+        record_bookings([booking])
         
-        return jsonify({'success': True, 'booking_id': booking['id']})
+        result = {'success': True, 'booking_id': booking['id']}
+        if idempotency_key:
+            booking_idempotency.complete(idempotency_key, (result, 200))
+        return jsonify(result)
         
     except Exception as e:
+        # Failed attempts are not cached, so a retry with the same key runs again
+        if idempotency_key:
+            booking_idempotency.abort(idempotency_key)
         return jsonify({'success': False, 'error': str(e)}), 400
 
+@app.route('/api/book-tickets', methods=['POST'])
+def book_tickets_batch():
+    """Book a batch of tickets in one call
+    
+    Body: {"bookings": [{...}, ...]} with the same fields as /api/book-ticket.
+    Valid items are stored in a single transaction and live sales counters are
+    updated once; the response has one result per item, in order.
+    """
+    try:
+        data = request.get_json()
+        items = data.get('bookings') if isinstance(data, dict) else data
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'success': False, 'error': 'Expected a non-empty "bookings" array'}), 400
+        if len(items) > MAX_BOOKING_BATCH:
+            return jsonify({'success': False, 'error': f'At most {MAX_BOOKING_BATCH} bookings per batch'}), 413
+        
+        results = [None] * len(items)
+        valid_indexes = []
+        valid_bookings = []
+        reservations = []
+        for index, item in enumerate(items):
+            error = validate_booking_data(item)
+            event = event_registry.get(item['event_id']) if not error else None
+            if not error and not event:
+                error = 'Event not found'
+            reservation = seat_inventory.reserve(event['id']) if not error else None
+            if not error and reservation is None:
+                error = 'Sold out'
+            if error:
+                results[index] = {'index': index, 'success': False, 'error': error}
+            else:
+                valid_indexes.append(index)
+                valid_bookings.append(build_booking(item))
+                reservations.append((event, reservation))
+        
+        if valid_bookings:
+            try:
+                booking_ids = booking_store.add_many(valid_bookings)
+            except Exception:
+                for _, reservation in reservations:
+                    seat_inventory.release(reservation)
+                raise
+            for event, reservation in reservations:
+                sold = seat_inventory.commit(reservation)
+                engagement_timeline.record(event['id'], 'attendance_change', sold)
+                dashboard_totals.record_sale(event)
+            stored = [{'id': booking_id, **booking} for booking_id, booking in zip(booking_ids, valid_bookings)]
+            record_bookings(stored)
+            
+            for index, booking in zip(valid_indexes, stored):
+                results[index] = {'index': index, 'success': True, 'booking_id': booking['id']}
+        
+        return jsonify({
+            'success': True,
+            'booked': len(valid_bookings),
+            'failed': len(items) - len(valid_bookings),
+            'results': results
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+def validate_booking_data(data):
+    """Return an error message for invalid booking data, or None"""
+    if not isinstance(data, dict):
+        return 'Booking must be a JSON object'
+    if data.get('event_id') in (None, ''):
+        return 'event_id is required'
+    ticket_price = data.get('ticket_price', 250000)
+    if isinstance(ticket_price, bool) or not isinstance(ticket_price, (int, float)) or ticket_price < 0:
+        return 'ticket_price must be a non-negative number'
+    return None
+
+def build_booking(data):
+    """Build a booking record (without id) from request data"""
+    return {
+        'event_id': data.get('event_id'),
+        'attendee_name': data.get('attendee_name'),
+        'attendee_email': data.get('attendee_email'),
+        'ticket_price': data.get('ticket_price', 250000),
+        'currency': data.get('currency', 'INR'),
+        'booking_time': datetime.now().isoformat(),
+        'status': 'confirmed'
+    }
+
+def record_bookings(bookings):
+    """Update live sales data once for stored bookings and push them to stream subscribers"""
+    event_booking_columns.add(bookings)
+    
+    with live_sales_lock:
+        live_sales_data['total_sales'] += len(bookings)
+        live_sales_data['total_revenue'] += sum(booking['ticket_price'] for booking in bookings)
+        
+        # Keep only last 10 recent bookings, newest first
+        live_sales_data['recent_bookings'] = (bookings[::-1] + live_sales_data['recent_bookings'])[:10]
+        
+        totals = {
+            'total_sales': live_sales_data['total_sales'],
+            'total_revenue': live_sales_data['total_revenue']
+        }
+    
+    # Push to live sales stream subscribers (one message per batch)
+    if len(bookings) == 1:
+        sales_broadcaster.publish('booking', {'booking': bookings[0], **totals})
+    else:
+        sales_broadcaster.publish('bookings', {'bookings': bookings[::-1][:10], 'count': len(bookings), **totals})
+
 @app.route('/api/create-event', methods=['POST'])
 def create_event_api():
     """Create a new event"""
@@ -223,7 +409,7 @@ def create_event_api():
         data = request.get_json()
         
         # Generate new event ID
-        new_id = max([e['id'] for e in events], default=0) + 1
+        new_id = event_registry.next_id()
         
         new_event = {
             'id': new_id,
@@ -241,7 +427,9 @@ def create_event_api():
             'created_at': datetime.now().isoformat()
         }
         
-        events.append(new_event)
+        event_registry.add(new_event)
+        seat_inventory.track(new_event)
+        dashboard_totals.add_event(new_event)
         save_events(events)
         
         return jsonify({'success': True, 'event_id': new_id})
@@ -254,39 +442,72 @@ def get_live_sales():
     """Get live sales data"""
     return jsonify(live_sales_data)
 
+@app.route('/api/live-sales/stream')
+def stream_live_sales():
+    """Stream live bookings as Server-Sent Events"""
+    return Response(
+        sales_broadcaster.stream(initial_event=('snapshot', live_sales_data)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/export-bookings')
 def export_bookings():
-    """Export booking data as CSV"""
+    """Stream booking data as CSV
+    
+    Query parameters: `event_id`, `from` / `to` (ISO booking times, `to`
+    exclusive) and `gzip=1` for a compressed download. Rows are written as
+    they are read from the store, so memory use stays constant.
+    """
     import csv
     import io
+    import zlib
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    event_id = request.args.get('event_id') or None
+    start = request.args.get('from') or None
+    end = request.args.get('to') or None
+    use_gzip = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
     
-    # Write header
-    writer.writerow(['Booking ID', 'Event ID', 'Attendee Name', 'Email', 'Ticket Price', 'Currency', 'Booking Time', 'Status'])
+    def generate_csv():
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        # Write header
+        writer.writerow(['Booking ID', 'Event ID', 'Attendee Name', 'Email', 'Ticket Price', 'Currency', 'Booking Time', 'Status'])
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+        
+        # Write data, flushing roughly every 64 KB
+        for row in booking_store.iter_rows(event_id=event_id, start=start, end=end):
+            writer.writerow(row)
+            if output.tell() >= 65536:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        
+        yield output.getvalue()
     
-    # Write data
-    for booking in ticket_bookings:
-        writer.writerow([
-            booking['id'],
-            booking['event_id'],
-            booking['attendee_name'],
-            booking['attendee_email'],
-            booking['ticket_price'],
-            booking['currency'],
-            booking['booking_time'],
-            booking['status']
-        ])
+    def generate_gzip():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+        for chunk in generate_csv():
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
     
-    output.seek(0)
-    csv_data = output.getvalue()
+    filename = f"ticket_bookings_event_{event_id}.csv" if event_id else 'ticket_bookings.csv'
+    if use_gzip:
+        return Response(
+            generate_gzip(),
+            mimetype='application/gzip',
+            headers={'Content-Disposition': f'attachment; filename={filename}.gz'}
+        )
     
-    from flask import Response
     return Response(
-        csv_data,
+        generate_csv(),
         mimetype='text/csv',
-        headers={'Content-Disposition': 'attachment; filename=ticket_bookings.csv'}
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
     )
 
 @app.route('/create-event')
@@ -345,27 +566,61 @@ feedback_data = {
 
 @app.route('/api/dashboard', methods=['GET'])
 def get_dashboard_stats():
-    """Get dashboard overview statistics"""
-    total_events = len(events)
-    total_revenue = sum(event.get('ticketPrice', 0) * event.get('attendees', 0) for event in events)
-    total_attendees = sum(event.get('attendees', 0) for event in events)
-    avg_rating = feedback_data.get('avg_rating', 4.6)
+    """Get dashboard overview statistics
+    
+    Totals are maintained as events change, so this is O(1); `?rebuild=1`
+    recomputes them from the event catalogue first.
+    """
+    if request.args.get('rebuild', '').lower() in ('1', 'true', 'yes'):
+        dashboard_totals.rebuild(events)
     
     return jsonify({
         'stats': {
-            'total_events': total_events,
-            'total_revenue': total_revenue,
-            'total_attendees': total_attendees,
-            'avg_rating': avg_rating
+            **dashboard_totals.snapshot(),
+            'avg_rating': feedback_data.get('avg_rating', 4.6)
         },
         'recent_events': events[-4:],  # Last 4 events
         'revenue_trend': analytics_data['revenue']['weekly_data']
     })
 
+# Page size limits for /api/events
+DEFAULT_EVENTS_PAGE = 50
+MAX_EVENTS_PAGE = 500
+
 @app.route('/api/events', methods=['GET'])
 def get_events():
-    """Get all events"""
-    return jsonify({'events': events})
+    """List events ordered by date, one page at a time
+    
+    Query params: status (upcoming|live|completed), from / to (inclusive ISO
+    dates), cursor (next_cursor of the previous page), limit and fields
+    (comma-separated projection, e.g. fields=id,title,status).
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', DEFAULT_EVENTS_PAGE)), 1), MAX_EVENTS_PAGE)
+        cursor = request.args.get('cursor')
+        
+        page, has_more = event_registry.page(
+            status=request.args.get('status') or None,
+            date_from=request.args.get('from') or None,
+            date_to=request.args.get('to') or None,
+            after=decode_cursor(cursor) if cursor else None,
+            limit=limit
+        )
+        
+        fields = [field for field in request.args.get('fields', '').split(',') if field]
+        if fields:
+            items = [{field: event[field] for field in fields if field in event} for event in page]
+        else:
+            items = page
+        
+        return jsonify({
+            'events': items,
+            'count': len(items),
+            'next_cursor': encode_cursor(page[-1]) if has_more else None
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
 @app.route('/api/analytics/revenue', methods=['GET'])
 def get_revenue_analytics():
@@ -379,8 +634,26 @@ def get_engagement_analytics():
 
 @app.route('/api/events/<int:event_id>/engagement', methods=['GET'])
 def get_event_engagement(event_id):
-    """Get engagement data for specific event"""
+    """Get engagement data for specific event
+    
+    With `?since=<version>` this is a long-poll: the request blocks until the
+    event's engagement version changes or `timeout` seconds (default 25) pass.
+    """
     try:
+        version = engagement_versions.current(event_id)
+        
+        since = request.args.get('since', type=int)
+        if since is not None:
+            timeout = min(request.args.get('timeout', 25, type=float), LONG_POLL_MAX_TIMEOUT)
+            version = engagement_versions.wait_for_change(event_id, since, max(timeout, 0))
+            if version == since:
+                return jsonify({
+                    'success': True,
+                    'changed': False,
+                    'version': version
+                })
+        
+        engagement_store.sync(event_id)
         event_engagement = engagement_data.get(str(event_id), {
             'polls': [],
             'qa_questions': [],
@@ -389,7 +662,9 @@ def get_event_engagement(event_id):
         
         return jsonify({
             'success': True,
-            'polls': event_engagement.get('polls', []),
+            'changed': True,
+            'version': version,
+            'polls': [poll_vote_counters.snapshot(event_id, poll) for poll in event_engagement.get('polls', [])],
             'qa_questions': event_engagement.get('qa_questions', []),
             'live_attendance': event_engagement.get('live_attendance', 0)
         })
@@ -406,11 +681,12 @@ def handle_event_polls(event_id):
     event_id_str = str(event_id)
     
     if request.method == 'GET':
-        # Get polls for this event
+        # Get polls for this event (consistent counter snapshot per poll)
+        engagement_store.sync(event_id_str)
         event_polls = engagement_data.get(event_id_str, {}).get('polls', [])
         return jsonify({
             'success': True,
-            'polls': event_polls
+            'polls': [poll_vote_counters.snapshot(event_id_str, poll) for poll in event_polls]
         })
     
     elif request.method == 'POST':
@@ -425,24 +701,19 @@ def handle_event_polls(event_id):
                     'live_attendance': 240
                 }
             
-            # Create new poll
-            existing_polls = engagement_data[event_id_str].get('polls', [])
-            new_poll_id = max([p.get('id', 0) for p in existing_polls], default=0) + 1
-            
-            new_poll = {
-                'id': new_poll_id,
+            # Create new poll (the event container allocates the next id)
+            new_poll = engagement_store.get(event_id_str, engagement_data[event_id_str]).create_poll(lambda poll_id: {
+                'id': poll_id,
                 'question': data.get('question', ''),
                 'options': data.get('options', []),
                 'responses': 0,
                 'active': True,
                 'created': datetime.now().isoformat(),
                 'option_votes': {option: 0 for option in data.get('options', [])}
-            }
+            })
             
-            engagement_data[event_id_str]['polls'].append(new_poll)
-            
-            # Save engagement data
-            save_engagement_data()
+            # Log engagement mutation
+            log_engagement_mutation({'op': 'poll_create', 'event_id': event_id_str, 'poll': new_poll})
             
             return jsonify({
                 'success': True,
@@ -463,11 +734,11 @@ def delete_poll(event_id, poll_id):
         event_id_str = str(event_id)
         
         if event_id_str in engagement_data and 'polls' in engagement_data[event_id_str]:
-            polls = engagement_data[event_id_str]['polls']
-            engagement_data[event_id_str]['polls'] = [p for p in polls if p.get('id') != poll_id]
+            engagement_store.get(event_id_str, engagement_data[event_id_str]).delete_poll(poll_id)
+            poll_vote_counters.discard(event_id_str, poll_id)
             
-            # Save engagement data
-            save_engagement_data()
+            # Log engagement mutation
+            log_engagement_mutation({'op': 'poll_delete', 'event_id': event_id_str, 'poll_id': poll_id})
             
             return jsonify({
                 'success': True,
@@ -495,30 +766,27 @@ def vote_on_poll(event_id, poll_id):
         event_id_str = str(event_id)
         
         if event_id_str in engagement_data and 'polls' in engagement_data[event_id_str]:
-            polls = engagement_data[event_id_str]['polls']
+            poll = engagement_store.get(event_id_str, engagement_data[event_id_str]).get_poll(poll_id)
             
-            for poll in polls:
-                if poll.get('id') == poll_id:
-                    # Increment vote count
-                    if 'option_votes' not in poll:
-                        poll['option_votes'] = {}
-                    
-                    if selected_option in poll['option_votes']:
-                        poll['option_votes'][selected_option] += 1
-                    else:
-                        poll['option_votes'][selected_option] = 1
-                    
-                    # Update total responses
-                    poll['responses'] = poll.get('responses', 0) + 1
-                    
-                    # Save engagement data
-                    save_engagement_data()
-                    
-                    return jsonify({
-                        'success': True,
-                        'message': 'Vote recorded successfully',
-                        'poll': poll
-                    })
+            if poll is not None:
+                # Increment vote and response counts atomically
+                poll_snapshot = poll_vote_counters.vote(event_id_str, poll, selected_option)
+                
+                # Log engagement mutation
+                log_engagement_mutation({
+                    'op': 'poll_vote',
+                    'event_id': event_id_str,
+                    'poll_id': poll_id,
+                    'option': selected_option,
+                    'votes': poll_snapshot['option_votes'][selected_option],
+                    'responses': poll_snapshot['responses']
+                })
+                
+                return jsonify({
+                    'success': True,
+                    'message': 'Vote recorded successfully',
+                    'poll': poll_snapshot
+                })
             
             return jsonify({
                 'success': False,
@@ -538,10 +806,31 @@ def vote_on_poll(event_id, poll_id):
 
 @app.route('/api/events/<int:event_id>/qa', methods=['GET', 'POST'])
 def handle_qa_questions(event_id):
-    """Handle Q&A questions for specific event"""
+    """Handle Q&A questions for specific event
+    
+    GET accepts `?top=N&order=votes|hot` to return only the N highest ranked
+    questions, read from the event's live ranking.
+    """
     event_id_str = str(event_id)
     
     if request.method == 'GET':
+        engagement_store.sync(event_id_str)
+        top = request.args.get('top')
+        if top:
+            order = request.args.get('order', 'votes')
+            if order not in RANKING_ORDERS:
+                return jsonify({'success': False, 'error': f"order must be one of: {', '.join(RANKING_ORDERS)}"}), 400
+            try:
+                limit = min(max(int(top), 1), 500)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'top must be an integer'}), 400
+            ranking = qa_rankings.get(event_id, engagement_data.get(event_id_str, {}))
+            return jsonify({
+                'success': True,
+                'order': order,
+                'qa_questions': ranking.top(limit, order)
+            })
+        
         # Get Q&A questions for this event
         event_qa = engagement_data.get(event_id_str, {}).get('qa_questions', [])
         return jsonify({
@@ -561,22 +850,19 @@ def handle_qa_questions(event_id):
                     'live_attendance': 240
                 }
             
-            # Create new Q&A question
-            existing_qa = engagement_data[event_id_str].get('qa_questions', [])
-            new_qa_id = max([q.get('id', 0) for q in existing_qa], default=0) + 1
-            
-            new_question = {
-                'id': new_qa_id,
-                'question': data.get('question', ''),
-                'votes': 0,
-                'answered': False,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            engagement_data[event_id_str]['qa_questions'].append(new_question)
+            # Create new Q&A question (the event container allocates the next id)
+            new_question = engagement_store.get(event_id_str, engagement_data[event_id_str]).create_question(
+                lambda question_id: {
+                    'id': question_id,
+                    'question': data.get('question', ''),
+                    'votes': 0,
+                    'answered': False,
+                    'timestamp': datetime.now().isoformat()
+                }
+            )
             
-            # Save engagement data
-            save_engagement_data()
+            # Log engagement mutation
+            log_engagement_mutation({'op': 'qa_create', 'event_id': event_id_str, 'question': new_question})
             
             return jsonify({
                 'success': True,
@@ -597,20 +883,68 @@ def vote_on_question(event_id, question_id):
         event_id_str = str(event_id)
         
         if event_id_str in engagement_data and 'qa_questions' in engagement_data[event_id_str]:
-            qa_questions = engagement_data[event_id_str]['qa_questions']
+            event_engagement = engagement_store.get(event_id_str, engagement_data[event_id_str])
+            votes = event_engagement.upvote_question(question_id)
             
-            for question in qa_questions:
-                if question.get('id') == question_id:
-                    question['votes'] = question.get('votes', 0) + 1
-                    
-                    # Save engagement data
-                    save_engagement_data()
-                    
-                    return jsonify({
-                        'success': True,
-                        'message': 'Vote recorded successfully',
-                        'question': question
-                    })
+            if votes is not None:
+                # Log engagement mutation
+                log_engagement_mutation({
+                    'op': 'qa_vote',
+                    'event_id': event_id_str,
+                    'question_id': question_id,
+                    'votes': votes
+                })
+                
+                return jsonify({
+                    'success': True,
+                    'message': 'Vote recorded successfully',
+                    'question': event_engagement.get_question(question_id)
+                })
+            
+            return jsonify({
+                'success': False,
+                'error': 'Question not found'
+            }), 404
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Event not found'
+            }), 404
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/events/<int:event_id>/qa/<int:question_id>/answer', methods=['POST'])
+def answer_question(event_id, question_id):
+    """Mark a Q&A question as answered (or unanswered)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        answered = bool(data.get('answered', True))
+        
+        event_id_str = str(event_id)
+        
+        if event_id_str in engagement_data and 'qa_questions' in engagement_data[event_id_str]:
+            question = engagement_store.get(event_id_str, engagement_data[event_id_str]).get_question(question_id)
+            
+            if question is not None:
+                question['answered'] = answered
+                
+                # Log engagement mutation
+                log_engagement_mutation({
+                    'op': 'qa_answer',
+                    'event_id': event_id_str,
+                    'question_id': question_id,
+                    'answered': answered
+                })
+                
+                return jsonify({
+                    'success': True,
+                    'message': 'Question updated successfully',
+                    'question': question
+                })
             
             return jsonify({
                 'success': False,
@@ -635,11 +969,10 @@ def delete_question(event_id, question_id):
         event_id_str = str(event_id)
         
         if event_id_str in engagement_data and 'qa_questions' in engagement_data[event_id_str]:
-            qa_questions = engagement_data[event_id_str]['qa_questions']
-            engagement_data[event_id_str]['qa_questions'] = [q for q in qa_questions if q.get('id') != question_id]
+            engagement_store.get(event_id_str, engagement_data[event_id_str]).delete_question(question_id)
             
-            # Save engagement data
-            save_engagement_data()
+            # Log engagement mutation
+            log_engagement_mutation({'op': 'qa_delete', 'event_id': event_id_str, 'question_id': question_id})
             
             return jsonify({
                 'success': True,
@@ -657,14 +990,29 @@ def delete_question(event_id, question_id):
             'error': str(e)
         }), 500
 
+@timed('save_engagement_data')
 def save_engagement_data():
-    """Save engagement data to file"""
+    """Save a full engagement data snapshot and truncate the mutation log"""
     try:
-        with open('engagement_data.json', 'w') as f:
-            json.dump(engagement_data, f, indent=2)
+        engagement_log.compact(engagement_data)
     except Exception as e:
         print(f"Error saving engagement data: {e}")
 
+@timed('log_engagement_mutation')
+def log_engagement_mutation(record):
+    """Append a single engagement mutation to the log (compacted periodically in the background)"""
+    try:
+        engagement_log.append(record, engagement_data)
+    except Exception as e:
+        print(f"Error logging engagement mutation: {e}")
+    
+    # Keep post-event aggregates and the timeline current and wake long-poll watchers of this event
+    event_aggregates.apply(record)
+    qa_rankings.apply(record)
+    event = event_registry.get(record['event_id'])
+    engagement_timeline.record_mutation(record, event.get('attendees', 0) if event else 0)
+    engagement_versions.bump(record['event_id'])
+
 @app.route('/api/events/<int:event_id>/qa-questions', methods=['POST'])
 def add_qa_question_alt(event_id):
     """Alternative endpoint for adding Q&A questions"""
@@ -711,6 +1059,48 @@ def export_data(data_type):
     
     return jsonify({'error': 'Invalid data type'}), 400
 
+@app.route('/api/analytics/events/<event_id>/percentile', methods=['GET'])
+def get_event_percentile(event_id):
+    """Percentile rank of an archived event among all archived events (?metric=engagement_rate)"""
+    try:
+        result = percentile_rank(event_id, request.args.get('metric', 'engagement_rate'))
+        if result is None:
+            return jsonify({'error': 'Event has not been archived'}), 404
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/api/analytics/top-categories', methods=['GET'])
+def get_top_categories():
+    """Most common Q&A categories across archived events"""
+    try:
+        limit = min(int(request.args.get('limit', 10)), 100)
+        return jsonify({'categories': top_categories(limit)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Recent background jobs, optionally filtered with ?status=queued|running|done|failed"""
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+        return jsonify({'jobs': job_queue.list(status=request.args.get('status'), limit=limit)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status and result of a background job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose request and persistence metrics in Prometheus text format"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/live-updates', methods=['GET'])
 def get_live_updates():
     """Get real-time updates for live events"""
@@ -725,7 +1115,7 @@ def get_live_updates():
 @app.route('/api/events/<int:event_id>/analytics', methods=['GET'])
 def get_event_analytics(event_id):
     """Get analytics for specific event"""
-    event = next((e for e in events if e['id'] == event_id), None)
+    event = event_registry.get(event_id)
     if not event:
         return jsonify({'error': 'Event not found'}), 404
     
@@ -733,28 +1123,36 @@ def get_event_analytics(event_id):
     event_analytics = {
         'event': event,
         'revenue': event['ticketPrice'] * event['attendees'],
+        'remaining_seats': (seat_inventory.status(event_id) or {}).get('remaining'),
         'engagement_rate': 75,
         'satisfaction_score': 4.5,
-        'attendance_trend': [
-            {'time': '10:00', 'attendees': 50},
-            {'time': '11:00', 'attendees': 120},
-            {'time': '12:00', 'attendees': event['attendees']},
-        ]
+        'attendance_trend': engagement_timeline.trend(event_id),
+        # Revenue by hour, price percentiles, cumulative sales and velocity from the stored bookings
+        'booking_analytics': event_booking_columns.report(event_id)
     }
     return jsonify(event_analytics)
 
+@app.route('/api/events/<int:event_id>/inventory', methods=['GET'])
+def get_event_inventory(event_id):
+    """Seat counts for an event: capacity, sold, reserved and remaining"""
+    inventory = seat_inventory.status(event_id)
+    if inventory is None:
+        return jsonify({'error': 'Event not found'}), 404
+    return jsonify({'event_id': event_id, **inventory})
+
 @app.route('/api/events/<int:event_id>/go-live', methods=['POST'])
 def go_live_event(event_id):
     """Set event status to live"""
     try:
         # Find the event
-        event = next((e for e in events if e['id'] == event_id), None)
+        event = event_registry.get(event_id)
         if not event:
             return jsonify({'success': False, 'error': 'Event not found'}), 404
         
         # Update event status to live
-        event['status'] = 'live'
-        event['live_start_time'] = datetime.now().isoformat()
+        previous_status = event_registry.update(event_id, status='live', live_start_time=datetime.now().isoformat())
+        dashboard_totals.status_changed(previous_status, 'live')
+        engagement_versions.bump(event_id)
         
         # Save events data
         save_events(events)
@@ -768,7 +1166,7 @@ def go_live_event(event_id):
 def get_event_status(event_id):
     """Get event status"""
     try:
-        event = next((e for e in events if e['id'] == event_id), None)
+        event = event_registry.get(event_id)
         if not event:
             return jsonify({'error': 'Event not found'}), 404
         
@@ -785,18 +1183,23 @@ def end_event(event_id):
     """End event and save data"""
     try:
         # Update event status
-        for event in events:
-            if event['id'] == event_id:
-                event['status'] = 'completed'
-                event['ended_at'] = datetime.now().isoformat()
-                break
+        event = event_registry.get(event_id)
+        if not event:
+            return jsonify({'success': False, 'error': 'Event not found'}), 404
+        previous_status = event_registry.update(event_id, status='completed', ended_at=datetime.now().isoformat())
+        dashboard_totals.status_changed(previous_status, 'completed')
+        engagement_versions.bump(event_id)
         
         # Save events data
         save_events(events)
         
+        # Archive analytics in the background so the request returns immediately
+        job_id = job_queue.enqueue('capture_event', {'event_id': event_id})
+        
         return jsonify({
             'success': True,
-            'message': 'Event ended successfully'
+            'message': 'Event ended successfully',
+            'job_id': job_id
         })
             
     except Exception as e:
@@ -810,7 +1213,7 @@ def get_post_event_analytics(event_id):
     """Get post-event analytics with real data for completed events only"""
     try:
         # Get event data
-        event = next((e for e in events if str(e['id']) == str(event_id)), None)
+        event = event_registry.get(event_id)
         if not event:
             return jsonify({'error': 'Event not found'}), 404
         
@@ -822,15 +1225,15 @@ def get_post_event_analytics(event_id):
                 'message': 'Analytics will be available after the event ends'
             }), 400
         
-        # Get real engagement data for this event
+        # Get real engagement data for this event from the running aggregates
+        engagement_store.sync(event_id)
         event_engagement = engagement_data.get(str(event_id), {})
-        polls = event_engagement.get('polls', [])
-        qa_questions = event_engagement.get('qa_questions', [])
         live_attendance = event_engagement.get('live_attendance', 0)
+        aggregate = event_aggregates.get(event_id, event_engagement).summary(live_attendance)
         
-        # Calculate real metrics from actual event data
-        total_poll_responses = sum(poll.get('responses', 0) for poll in polls)
-        total_qa_questions = len(qa_questions)
+        total_polls = aggregate['total_polls']
+        total_poll_responses = aggregate['total_poll_responses']
+        total_qa_questions = aggregate['total_qa_questions']
         
         # Calculate real revenue based on event ticket price and attendance
         ticket_price = event.get('ticketPrice', 0)
@@ -847,7 +1250,7 @@ def get_post_event_analytics(event_id):
             'total_attendees': live_attendance,
             'total_capacity': event.get('capacity', 500),
             'total_tickets_sold': live_attendance,
-            'total_polls': len(polls),
+            'total_polls': total_polls,
             'total_poll_responses': total_poll_responses,
             'total_qa_questions': total_qa_questions,
             'engagement_rate': round(engagement_rate, 1),
@@ -857,45 +1260,9 @@ def get_post_event_analytics(event_id):
             'ticket_price': ticket_price
         }
         
-        # Convert polls data to analytics format
-        polls_analytics = []
-        for poll in polls:
-            if poll.get('options') and poll.get('option_votes'):
-                total_votes = poll.get('responses', 0)
-                options_data = []
-                
-                for option in poll['options']:
-                    votes = poll['option_votes'].get(option, 0)
-                    percentage = round((votes / max(total_votes, 1)) * 100, 1)
-                    options_data.append({
-                        'text': option,
-                        'votes': votes,
-                        'percentage': percentage
-                    })
-                
-                response_rate = round((total_votes / max(live_attendance, 1)) * 100, 1)
-                
-                polls_analytics.append({
-                    'id': poll.get('id'),
-                    'poll_question': poll.get('question'),
-                    'poll_type': 'custom',
-                    'total_responses': total_votes,
-                    'response_rate': response_rate,
-                    'options': options_data
-                })
-        
-        # Convert Q&A data to analytics format
-        qa_analytics = []
-        for qa in qa_questions:
-            qa_analytics.append({
-                'id': qa.get('id'),
-                'question_text': qa.get('question'),
-                'category': 'General',
-                'vote_count': qa.get('votes', 0),
-                'is_answered': qa.get('answered', False),
-                'priority_level': 'high' if qa.get('votes', 0) > 15 else 'medium' if qa.get('votes', 0) > 5 else 'low',
-                'response_time': 120  # Mock response time
-            })
+        # Polls and Q&A rows are kept in analytics format by the aggregate
+        polls_analytics = aggregate['polls_analytics']
+        qa_analytics = aggregate['qa_analytics']
         
         # Generate insights based on real data
         insights = []
@@ -909,13 +1276,13 @@ def get_post_event_analytics(event_id):
                 'supporting_data': {'engagement_rate': engagement_rate, 'total_interactions': total_interactions}
             })
         
-        if len(polls) > 0:
+        if total_polls > 0:
             insights.append({
                 'type': 'strength',
                 'category': 'interaction',
-                'text': f'Successfully used {len(polls)} interactive polls generating {total_poll_responses} responses.',
+                'text': f'Successfully used {total_polls} interactive polls generating {total_poll_responses} responses.',
                 'confidence': 0.90,
-                'supporting_data': {'polls_count': len(polls), 'responses': total_poll_responses}
+                'supporting_data': {'polls_count': total_polls, 'responses': total_poll_responses}
             })
         
         if total_qa_questions > 5:
@@ -960,20 +1327,20 @@ def get_post_event_analytics(event_id):
             },
             'analytics_summary': {
                 'total_interactions': total_interactions,
-                'avg_poll_response_rate': round(total_poll_responses / max(len(polls), 1), 1),
-                'qa_answer_rate': round((sum(1 for qa in qa_questions if qa.get('answered', False)) / max(len(qa_questions), 1)) * 100, 1),
+                'avg_poll_response_rate': round(total_poll_responses / max(total_polls, 1), 1),
+                'qa_answer_rate': round((aggregate['total_qa_answered'] / max(total_qa_questions, 1)) * 100, 1),
                 'revenue_per_attendee': round(total_revenue / max(live_attendance, 1), 2),
-                'most_engaging_poll': polls[0].get('question', 'N/A') if polls else 'N/A',
-                'top_question': max(qa_questions, key=lambda x: x.get('votes', 0)).get('question', 'N/A') if qa_questions else 'N/A',
+                'most_engaging_poll': aggregate['most_engaging_poll'],
+                'top_question': aggregate['top_question'],
                 'overall_satisfaction': 4.3,
                 'key_strengths': [
                     f'Generated {real_analytics["currency"]} {total_revenue:,} revenue',
                     f'{engagement_rate:.1f}% audience engagement',
-                    f'{len(polls)} interactive polls created'
+                    f'{total_polls} interactive polls created'
                 ],
                 'improvement_areas': [
                     'Consider longer Q&A sessions' if total_qa_questions > 10 else 'Encourage more questions',
-                    'Add more interactive elements' if len(polls) < 3 else 'Maintain poll frequency',
+                    'Add more interactive elements' if total_polls < 3 else 'Maintain poll frequency',
                     'Improve attendance marketing' if capacity_utilization < 80 else 'Great attendance!'
                 ]
             }
@@ -997,13 +1364,14 @@ def get_post_event_analytics(event_id):
         }), 500
 
 # Initialize and load all data on startup
+@timed('load_engagement_data')
 def load_engagement_data():
     """Load engagement data from storage"""
     global engagement_data
     try:
-        if os.path.exists('engagement_data.json'):
-            with open('engagement_data.json', 'r') as f:
-                engagement_data = json.load(f)
+        snapshot = engagement_log.load_snapshot()
+        if snapshot is not None:
+            engagement_data = snapshot
         else:
             # Initialize with sample data
             engagement_data = {
@@ -1028,6 +1396,17 @@ def load_engagement_data():
                     'live_attendance': 450
                 }
             }
+        
+        poll_vote_counters.clear()
+        event_aggregates.clear()
+        qa_rankings.clear()
+        engagement_store.clear()
+        
+        # Replay mutations logged since the last snapshot, then fold them in
+        replayed = engagement_log.replay(engagement_data)
+        if replayed:
+            print(f"🔁 Replayed {replayed} engagement mutations")
+            save_engagement_data()
     except Exception as e:
         print(f"Error loading engagement data: {e}")
         engagement_data = {}
@@ -1046,20 +1425,36 @@ def load_tickets_data():
         print(f"Error loading tickets data: {e}")
         tickets_data = {}
 
-def init_event_analytics_db():
-    """Skip database initialization"""
-    print("📊 Using simple JSON-based analytics (database disabled)")
+def run_event_capture(event_id):
+    """Job handler: archive a completed event's analytics, insights, sentiment and timeline"""
+    engagement_timeline.close(event_id)
+    event_booking_columns.close(event_id)
+    engagement_store.sync(event_id)
+    if not capture_event_data_on_completion(event_id, event_registry, engagement_data, tickets_data):
+        raise RuntimeError(f'Capturing event {event_id} failed')
+    return {'event_id': event_id}
+
+job_queue.register('capture_event', run_event_capture)
+
+def is_reloader_parent():
+    """True in the Werkzeug reloader's watcher process, which imports the app but never serves requests"""
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        return False
+    # `python app.py` runs with debug=True; `flask run --debug` reloads too
+    return __name__ == '__main__' or (os.environ.get('FLASK_RUN_FROM_CLI') == 'true' and get_debug_flag())
+
+# Load stored data and start the background workers (archival jobs, timeline
+# flushing) at import, so they also run under `flask run` and WSGI servers.
+# The reloader's watcher process skips the workers so jobs are run by one process.
+os.makedirs('data', exist_ok=True)
+load_engagement_data()
+load_tickets_data()
+init_event_analytics_db()
+if not is_reloader_parent():
+    job_queue.start()
+    engagement_timeline.start()
 
 if __name__ == '__main__':
-    # Create data directory if it doesn't exist
-    os.makedirs('data', exist_ok=True)
-    
-    # Load all data
-    events = load_events()
-    load_engagement_data()
-    load_tickets_data()
-    init_event_analytics_db()
-    
     print("🚀 COUSREVITA 2 Event Management System")
     print(f"📊 Loaded {len(events)} events")
     print(f"🎯 Loaded engagement data for {len(engagement_data)} events")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for in-memory booking records.
+
+Builds the same generated bookings once as dicts (the shape BookingStore
+rows are turned into) and once as BookingColumns, and reports the bytes
+retained per booking by each, measured with tracemalloc.
+
+Usage (from the backend directory):
+    python benchmarks/bench_memory.py                  # 100k bookings
+    python benchmarks/bench_memory.py --count 1000000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from booking_records import BookingColumns  # noqa: E402
+from booking_store import BOOKING_COLUMNS  # noqa: E402
+
+DEFAULT_COUNT = 100000
+
+
+def generate_rows(count, num_events=1000):
+    """Booking rows in BOOKING_COLUMNS order, each with freshly allocated strings like sqlite3 returns"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    for booking_id in range(1, count + 1):
+        attendee = rng.randrange(10 ** 6)
+        yield (
+            booking_id,
+            str(rng.randint(1, num_events)),
+            f'Attendee {attendee}',
+            f'attendee{attendee}@example.com',
+            rng.choice([100000, 250000, 450000]),
+            'INR'.lower().upper(),
+            (start + timedelta(seconds=booking_id * 7, microseconds=rng.randrange(10 ** 6))).isoformat(),
+            'confirmed'.upper().lower()
+        )
+
+
+def retained_bytes(build):
+    """Bytes still allocated after `build()` returns, with its result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def run(count):
+    dicts, dict_bytes = retained_bytes(lambda: [dict(zip(BOOKING_COLUMNS, row)) for row in generate_rows(count)])
+    columns, column_bytes = retained_bytes(lambda: BookingColumns(generate_rows(count)))
+
+    # Both representations must serialize to the same bookings
+    assert len(columns) == len(dicts) and columns.booking(count - 1) == dicts[-1]
+
+    return {
+        'bookings': count,
+        'dict_bytes_per_booking': round(dict_bytes / count, 1),
+        'columns_bytes_per_booking': round(column_bytes / count, 1),
+        'reduction': round(dict_bytes / column_bytes, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure bytes per in-memory booking record')
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT, help='number of bookings to generate')
+    args = parser.parse_args()
+
+    result = run(args.count)
+    print(f"🧮 {result['bookings']} bookings")
+    print(f"  dict records       {result['dict_bytes_per_booking']:>8.1f} bytes/booking")
+    print(f"  BookingColumns     {result['columns_bytes_per_booking']:>8.1f} bytes/booking")
+    print(f"  📉 {result['reduction']}x smaller")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Flask hot paths.
+
+Drives the real routes through the Flask test client against generated
+fixtures at several scales and writes per-route latency/throughput results to
+a JSON file. Every route is measured in several rounds (interleaved with the
+other routes) and scored by its fastest round median, which filters out most
+run-to-run noise. With a stored baseline, the run fails (exit code 1) when a
+route's score regresses past both the tolerance factor and an absolute noise
+floor, so sub-millisecond routes do not flake on scheduler jitter.
+
+Usage (from the backend directory):
+    python benchmarks/bench_routes.py                      # small + medium
+    python benchmarks/bench_routes.py --scales large,xl    # heavier fixtures
+    python benchmarks/bench_routes.py --update-baseline --runs 5      # store new baseline
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_RESULTS_FILE = os.path.join(BENCH_DIR, 'results.json')
+DEFAULT_BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+
+# name -> (events in catalogue, poll votes / questions on the benchmarked event, iterations per route)
+SCALES = {
+    'small': (10, 100, 200),
+    'medium': (1000, 10000, 100),
+    'large': (10000, 100000, 20),
+    'xl': (100000, 1000000, 5)
+}
+
+# A route fails when its score exceeds both baseline * tolerance and baseline + noise floor
+DEFAULT_TOLERANCE = 1.5
+DEFAULT_NOISE_FLOOR_MS = 0.25
+
+# Measurement rounds per route; the score is the fastest round's median
+DEFAULT_REPEATS = 5
+
+BENCH_EVENT_ID = 1
+
+
+def import_app(scratch_dir):
+    """Import the app inside `scratch_dir` so benchmarks never touch real data files"""
+    os.chdir(scratch_dir)
+    sys.path.insert(0, BACKEND_DIR)
+    import app
+    return app
+
+
+def stop_app(app_module):
+    """Stop the app's background workers so the scratch directory can be removed"""
+    app_module.job_queue.stop()
+    app_module.engagement_timeline.stop()
+
+
+def build_fixtures(app_module, num_events, num_interactions):
+    """Load `num_events` events and an engagement dataset with `num_interactions` votes and questions"""
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+
+    fixture_events = []
+    for event_id in range(1, num_events + 1):
+        fixture_events.append({
+            'id': event_id,
+            'title': f'Benchmark Event {event_id}',
+            'description': 'Generated benchmark event ' * 4,
+            'date': (start + timedelta(days=event_id % 365)).date().isoformat(),
+            'time': '09:00',
+            'location': 'Benchmark Hall',
+            'capacity': 1000,
+            'ticketPrice': rng.choice([100000, 250000, 450000]),
+            'currency': 'INR',
+            'image': '/static/images/default-event.jpg',
+            'attendees': rng.randint(0, 1000),
+            'status': rng.choice(['upcoming', 'live', 'completed']),
+            'created_at': start.isoformat()
+        })
+    fixture_events[0]['status'] = 'completed'
+    fixture_events[0]['attendees'] = 0  # Leave seats for every book_ticket iteration
+    fixture_events[0]['capacity'] = 10 ** 6  # ... across all measurement rounds
+    app_module.event_registry.load(fixture_events)
+    app_module.seat_inventory.load(fixture_events)
+    app_module.dashboard_totals.rebuild(fixture_events)
+
+    options = ['Option A', 'Option B', 'Option C', 'Option D']
+    polls = []
+    for poll_id in range(1, 11):
+        option_votes = {option: 0 for option in options}
+        for _ in range(num_interactions // 10):
+            option_votes[rng.choice(options)] += 1
+        polls.append({
+            'id': poll_id,
+            'question': f'Benchmark poll {poll_id}?',
+            'options': options,
+            'responses': sum(option_votes.values()),
+            'active': True,
+            'created': start.isoformat(),
+            'option_votes': option_votes
+        })
+
+    qa_questions = [
+        {
+            'id': question_id,
+            'question': f'Benchmark question {question_id} about the session schedule?',
+            'votes': rng.randint(0, 50),
+            'answered': rng.random() < 0.3,
+            'timestamp': start.isoformat()
+        }
+        for question_id in range(1, num_interactions + 1)
+    ]
+
+    app_module.engagement_data.clear()
+    app_module.engagement_data[str(BENCH_EVENT_ID)] = {
+        'polls': polls,
+        'qa_questions': qa_questions,
+        'live_attendance': 800
+    }
+    app_module.poll_vote_counters.clear()
+    app_module.event_aggregates.clear()
+    app_module.qa_rankings.clear()
+    app_module.engagement_store.clear()
+
+    # Start from the fixture bookings alone, so earlier scales and runs don't inflate the reports
+    with app_module.booking_store.connection() as conn:
+        conn.execute('DELETE FROM bookings')
+        conn.commit()
+    app_module.booking_store.add_many([
+        {
+            'event_id': str(BENCH_EVENT_ID),
+            'attendee_name': f'Bench Attendee {booking_id}',
+            'attendee_email': f'attendee{booking_id}@example.com',
+            'ticket_price': rng.choice([100000, 250000, 450000]),
+            'currency': 'INR',
+            'booking_time': (start + timedelta(seconds=booking_id * 30)).isoformat(),
+            'status': 'confirmed'
+        }
+        for booking_id in range(num_interactions)
+    ])
+    app_module.event_booking_columns.clear()
+
+
+def bench_route(client, name, make_request, iterations):
+    """Time `iterations` calls of `make_request(client)`; returns a result dict"""
+    # Warm up once so lazily built state is not charged to the first sample
+    make_request(client)
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = make_request(client)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{name} returned HTTP {response.status_code}')
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'median_ms': round(statistics.median(latencies), 4),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+        'ops_per_sec': round(1000 / statistics.mean(latencies), 1)
+    }
+
+
+def best_round(rounds):
+    """Combine per-round results: the round with the lowest median, plus every round's median"""
+    best = dict(min(rounds, key=lambda result: result['median_ms']))
+    best['round_medians_ms'] = [result['median_ms'] for result in rounds]
+    return best
+
+
+def median_run(runs):
+    """Combine per-run scores: the run with the median score, plus every run's score"""
+    ordered = sorted(runs, key=lambda result: result['median_ms'])
+    middle = dict(ordered[(len(ordered) - 1) // 2])
+    if len(runs) > 1:
+        middle['run_medians_ms'] = [result['median_ms'] for result in runs]
+    return middle
+
+
+def route_cases(num_interactions):
+    """Benchmarked routes: name -> callable issuing one request"""
+    rng = random.Random(7)
+    event_url = f'/api/events/{BENCH_EVENT_ID}'
+
+    return {
+        'book_ticket': lambda c: c.post('/api/book-ticket', json={
+            'event_id': BENCH_EVENT_ID,
+            'attendee_name': 'Bench User',
+            'attendee_email': 'bench@example.com',
+            'ticket_price': 250000
+        }),
+        'vote_on_poll': lambda c: c.post(f'{event_url}/polls/{rng.randint(1, 10)}/vote',
+                                         json={'option': 'Option A'}),
+        'vote_on_question': lambda c: c.post(f'{event_url}/qa/{rng.randint(1, num_interactions)}/vote'),
+        'handle_qa_questions_get': lambda c: c.get(f'{event_url}/qa'),
+        'handle_qa_questions_top': lambda c: c.get(f'{event_url}/qa?top=10&order=hot'),
+        'handle_qa_questions_post': lambda c: c.post(f'{event_url}/qa', json={'question': 'Benchmark follow-up?'}),
+        'get_post_event_analytics': lambda c: c.get(f'{event_url}/post-analytics'),
+        'get_event_analytics': lambda c: c.get(f'{event_url}/analytics'),
+        'get_dashboard_stats': lambda c: c.get('/api/dashboard')
+    }
+
+
+def run(scales, routes=None, repeats=DEFAULT_REPEATS, runs=1):
+    """Benchmark the routes; each run rebuilds the fixtures and measures `repeats` rounds
+
+    A route's score is its fastest round median within a run; with several
+    runs the median score across runs is kept, which is how baselines should
+    be recorded so they are typical rather than best-case numbers.
+    """
+    scratch_dir = tempfile.mkdtemp(prefix='eventpro-bench-')
+    original_dir = os.getcwd()
+    app_module = import_app(scratch_dir)
+    client = app_module.app.test_client()
+
+    scores = {}
+    try:
+        for run_index in range(runs):
+            for scale in scales:
+                num_events, num_interactions, iterations = SCALES[scale]
+                print(f"\n📏 Scale '{scale}': {num_events} events, {num_interactions} votes/questions"
+                      + (f" (run {run_index + 1}/{runs})" if runs > 1 else ''))
+                build_fixtures(app_module, num_events, num_interactions)
+
+                cases = {name: make_request for name, make_request in route_cases(num_interactions).items()
+                         if not routes or name in routes}
+                rounds = {name: [] for name in cases}
+                # Rounds interleave the routes so a slow patch of the machine hits all of them alike
+                for _ in range(repeats):
+                    for name, make_request in cases.items():
+                        rounds[name].append(bench_route(client, name, make_request, iterations))
+
+                for name in cases:
+                    result = best_round(rounds[name])
+                    scores.setdefault(scale, {}).setdefault(name, []).append(result)
+                    print(f"  {name:<28} median {result['median_ms']:>10.3f} ms   "
+                          f"p95 {result['p95_ms']:>10.3f} ms   {result['ops_per_sec']:>10.1f} ops/s")
+    finally:
+        stop_app(app_module)
+        os.chdir(original_dir)
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    results = {scale: {name: median_run(runs_of_route) for name, runs_of_route in routes_of_scale.items()}
+               for scale, routes_of_scale in scores.items()}
+    if runs > 1:
+        print(f"\n📐 Median of {runs} runs:")
+        for scale, routes_of_scale in results.items():
+            for name, result in routes_of_scale.items():
+                print(f"  [{scale}] {name:<28} median {result['median_ms']:>10.3f} ms")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance, noise_floor_ms=DEFAULT_NOISE_FLOOR_MS):
+    """List (scale, route, baseline_ms, current_ms) for routes that regressed
+
+    A route regressed when its median exceeds both baseline * tolerance and
+    baseline + noise_floor_ms.
+    """
+    regressions = []
+    for scale, routes in results.items():
+        for name, result in routes.items():
+            reference = baseline.get(scale, {}).get(name)
+            if not reference:
+                continue
+            limit = max(reference['median_ms'] * tolerance, reference['median_ms'] + noise_floor_ms)
+            if result['median_ms'] > limit:
+                regressions.append((scale, name, reference['median_ms'], result['median_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark EventPro Flask hot paths')
+    parser.add_argument('--scales', default='small,medium',
+                        help=f"comma-separated scales to run ({', '.join(SCALES)})")
+    parser.add_argument('--routes', default='', help='comma-separated subset of routes to run')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE, help='where to write JSON results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE, help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown factor over the baseline median')
+    parser.add_argument('--noise-floor', type=float, default=DEFAULT_NOISE_FLOOR_MS,
+                        help='slowdown in ms below which a route never counts as regressed')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help='measurement rounds per route; the fastest round median is kept')
+    parser.add_argument('--runs', type=int, default=1,
+                        help='full benchmark runs; the median score across runs is kept (use 5+ for baselines)')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+
+    scales = [scale.strip() for scale in args.scales.split(',') if scale.strip()]
+    unknown = [scale for scale in scales if scale not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+    routes = {route.strip() for route in args.routes.split(',') if route.strip()}
+
+    output = os.path.abspath(args.output)
+    baseline_file = os.path.abspath(args.baseline)
+
+    results = run(scales, routes, max(args.repeats, 1), max(args.runs, 1))
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'repeats': max(args.repeats, 1),
+        'runs': max(args.runs, 1),
+        'results': results
+    }
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📊 Results written to {output}")
+
+    if args.update_baseline:
+        with open(baseline_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline updated: {baseline_file}")
+        return 0
+
+    if not os.path.exists(baseline_file):
+        print("ℹ️  No baseline stored; run with --update-baseline to create one")
+        return 0
+
+    with open(baseline_file) as f:
+        baseline = json.load(f).get('results', {})
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance, args.noise_floor)
+    if regressions:
+        print(f"\n❌ {len(regressions)} route(s) regressed past {args.tolerance}x "
+              f"(and +{args.noise_floor} ms) baseline:")
+        for scale, name, reference_ms, current_ms in regressions:
+            print(f"  [{scale}] {name}: {reference_ms:.3f} ms -> {current_ms:.3f} ms")
+        return 1
+
+    print(f"\n✅ No regressions past {args.tolerance}x (and +{args.noise_floor} ms) baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
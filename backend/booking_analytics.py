@@ -0,0 +1,271 @@
+"""
+Columnar booking analytics for pre-event reports.
+
+Each event's bookings are loaded once into BookingColumns and kept current as
+bookings are stored; the most recently reported events stay loaded and an
+event's columns are dropped once it is closed. A report copies the time and
+price arrays under the event's lock (a memcpy, so bookings are not held up),
+views the copies as NumPy arrays and computes revenue by hour, the price
+distribution, the cumulative sales curve and sales velocity with vectorized
+operations, so it stays in the milliseconds for millions of bookings. Without
+NumPy installed the same report is computed in pure Python.
+"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from booking_records import PRICE_SCALE, from_epoch_us, from_price_units, to_epoch_us
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; reports fall back to pure Python
+    np = None
+
+US_PER_HOUR = 3600 * 10 ** 6
+PRICE_PERCENTILES = (10, 25, 50, 75, 90, 99)
+MAX_PRICE_TIERS = 20   # Most common ticket prices listed in the distribution
+MAX_LOADED_EVENTS = 64  # Events whose columns are kept in memory
+
+
+def _hour_label(hour):
+    return from_epoch_us(hour * US_PER_HOUR)[:13] + ':00'
+
+
+def _price(units):
+    """Price units (hundredths) as a JSON number in the booking's price shape"""
+    return from_price_units(int(round(units))) if float(units).is_integer() else round(units / PRICE_SCALE, 2)
+
+
+def _percentile(sorted_values, q):
+    """Linear-interpolation percentile of a sorted sequence (numpy.percentile's default method)"""
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _run_starts(sorted_values):
+    """Start index of each run of equal values in a sorted array"""
+    return np.concatenate(([0], np.flatnonzero(np.diff(sorted_values)) + 1))
+
+
+def _hourly_numpy(times, prices):
+    """(hours, bookings per hour, revenue units per hour) as Python lists"""
+    hours = times // US_PER_HOUR
+    if len(hours) > 1 and bool(np.all(hours[1:] >= hours[:-1])):
+        # Bookings are normally stored in time order: split at hour boundaries
+        starts = _run_starts(hours)
+        keys = hours[starts]
+        counts = np.diff(np.append(starts, len(hours)))
+        revenue = np.add.reduceat(prices, starts)
+    else:
+        keys, inverse = np.unique(hours, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        revenue = np.bincount(inverse, weights=prices, minlength=len(keys)).astype(np.int64)
+    return keys.tolist(), counts.tolist(), revenue.tolist()
+
+
+def _report_numpy(booked_at, prices, now_us):
+    times = np.frombuffer(booked_at, dtype=np.int64)
+    prices = np.frombuffer(prices, dtype=np.int64)
+
+    hours, counts, revenue = _hourly_numpy(times, prices)
+    # One sort serves the percentiles, the extremes and the price tiers
+    sorted_prices = np.sort(prices)
+    starts = _run_starts(sorted_prices)
+    tiers = sorted_prices[starts]
+    tier_counts = np.diff(np.append(starts, len(sorted_prices)))
+    top = np.argsort(-tier_counts, kind='stable')[:MAX_PRICE_TIERS]
+
+    return {
+        'total_revenue_units': int(prices.sum()),
+        'hours': hours,
+        'counts': counts,
+        'revenue': revenue,
+        'price_min': int(sorted_prices[0]),
+        'price_max': int(sorted_prices[-1]),
+        'price_mean': float(prices.mean()),
+        'percentiles': [float(_percentile(sorted_prices, q)) for q in PRICE_PERCENTILES],
+        'tiers': list(zip(tiers[top].tolist(), tier_counts[top].tolist())),
+        'first_us': int(times.min()),
+        'last_us': int(times.max()),
+        'last_hour': int(np.count_nonzero(times >= now_us - US_PER_HOUR)),
+        'last_24_hours': int(np.count_nonzero(times >= now_us - 24 * US_PER_HOUR))
+    }
+
+
+def _report_python(times, prices, now_us):
+    by_hour = {}
+    tier_counts = {}
+    for booked_at, price in zip(times, prices):
+        hour = booked_at // US_PER_HOUR
+        bucket = by_hour.get(hour)
+        if bucket is None:
+            bucket = by_hour[hour] = [0, 0]
+        bucket[0] += 1
+        bucket[1] += price
+        tier_counts[price] = tier_counts.get(price, 0) + 1
+    hours = sorted(by_hour)
+    sorted_prices = sorted(prices)
+    tiers = sorted(tier_counts.items(), key=lambda tier: (-tier[1], tier[0]))[:MAX_PRICE_TIERS]
+
+    return {
+        'total_revenue_units': sum(prices),
+        'hours': hours,
+        'counts': [by_hour[hour][0] for hour in hours],
+        'revenue': [by_hour[hour][1] for hour in hours],
+        'price_min': sorted_prices[0],
+        'price_max': sorted_prices[-1],
+        'price_mean': sum(prices) / len(prices),
+        'percentiles': [_percentile(sorted_prices, q) for q in PRICE_PERCENTILES],
+        'tiers': tiers,
+        'first_us': min(times),
+        'last_us': max(times),
+        'last_hour': sum(1 for booked_at in times if booked_at >= now_us - US_PER_HOUR),
+        'last_24_hours': sum(1 for booked_at in times if booked_at >= now_us - 24 * US_PER_HOUR)
+    }
+
+
+def booking_report(columns, now=None):
+    """Revenue by hour, price distribution, cumulative sales and velocity for BookingColumns"""
+    return _booking_report(columns.booked_at, columns.prices, now)
+
+
+def _booking_report(booked_at, prices, now=None):
+    """booking_report() over parallel 'q' arrays of booking times (epoch µs) and price units"""
+    total = len(prices)
+    if not total:
+        return {'total_bookings': 0, 'total_revenue': 0, 'revenue_by_hour': [], 'price_distribution': None,
+                'cumulative_sales': [], 'sales_velocity': None}
+
+    raw = (_report_numpy if np is not None else _report_python)(booked_at, prices, to_epoch_us(now or datetime.now()))
+
+    revenue_by_hour = []
+    cumulative_sales = []
+    running_bookings = running_revenue = 0
+    for hour, count, revenue in zip(raw['hours'], raw['counts'], raw['revenue']):
+        label = _hour_label(hour)
+        running_bookings += count
+        running_revenue += revenue
+        revenue_by_hour.append({'hour': label, 'bookings': count, 'revenue': _price(revenue)})
+        cumulative_sales.append({'hour': label, 'bookings': running_bookings, 'revenue': _price(running_revenue)})
+
+    peak = max(range(len(raw['counts'])), key=raw['counts'].__getitem__)
+    span_hours = max((raw['last_us'] - raw['first_us']) / US_PER_HOUR, 1)
+
+    return {
+        'total_bookings': total,
+        'total_revenue': _price(raw['total_revenue_units']),
+        'revenue_by_hour': revenue_by_hour,
+        'price_distribution': {
+            'min': _price(raw['price_min']),
+            'max': _price(raw['price_max']),
+            'mean': round(raw['price_mean'] / PRICE_SCALE, 2),
+            'percentiles': {f'p{q}': _price(value) for q, value in zip(PRICE_PERCENTILES, raw['percentiles'])},
+            'tiers': [{'price': _price(price), 'bookings': count} for price, count in raw['tiers']]
+        },
+        'cumulative_sales': cumulative_sales,
+        'sales_velocity': {
+            'bookings_per_hour': round(total / span_hours, 2),
+            'last_hour': raw['last_hour'],
+            'last_24_hours': raw['last_24_hours'],
+            'first_booking': from_epoch_us(raw['first_us']),
+            'last_booking': from_epoch_us(raw['last_us']),
+            'peak_hour': {'hour': _hour_label(raw['hours'][peak]), 'bookings': raw['counts'][peak]}
+        }
+    }
+
+
+class _EventColumns:
+    __slots__ = ('lock', 'ready', 'columns', 'pending', 'loaded_through', 'error')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.columns = None     # BookingColumns once loaded
+        self.pending = []       # Bookings stored while the columns were being loaded
+        self.loaded_through = 0
+        self.error = None
+
+    def publish(self, columns):
+        with self.lock:
+            self.columns = columns
+            # Bookings up to this id were in the store when the columns were loaded
+            self.loaded_through = columns.ids[-1] if len(columns) else 0
+            for booking in self.pending:
+                if booking['id'] > self.loaded_through:
+                    columns.append(booking)
+            self.pending = []
+        self.ready.set()
+
+    def add(self, booking):
+        with self.lock:
+            if self.columns is None:
+                self.pending.append(booking)
+            elif booking['id'] > self.loaded_through:
+                self.columns.append(booking)
+
+
+class EventBookingColumns:
+    """Lazily loaded BookingColumns per event id, kept current as bookings are stored
+
+    At most `max_events` events stay loaded; the least recently reported one is
+    dropped (and reloaded from the store if it is reported again).
+    """
+
+    def __init__(self, loader, max_events=MAX_LOADED_EVENTS):
+        self.loader = loader    # loader(event_id) -> BookingColumns of the event's stored bookings
+        self.max_events = max_events
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, event_id):
+        with self._lock:
+            entry = self._events.get(event_id)
+            is_loader = entry is None
+            if is_loader:
+                # Registered before loading so bookings stored meanwhile are buffered, not lost
+                entry = self._events[event_id] = _EventColumns()
+                while len(self._events) > self.max_events:
+                    self._events.popitem(last=False)
+            else:
+                self._events.move_to_end(event_id)
+        if is_loader:
+            try:
+                entry.publish(self.loader(event_id))
+            except Exception as e:
+                with self._lock:
+                    if self._events.get(event_id) is entry:
+                        del self._events[event_id]
+                entry.error = e
+                entry.ready.set()
+                raise
+        entry.ready.wait()
+        if entry.error is not None:
+            raise entry.error
+        return entry
+
+    def add(self, bookings):
+        """Append stored bookings (dicts with an 'id') to their events' columns, if loaded or loading"""
+        for booking in bookings:
+            entry = self._events.get(str(booking['event_id']))
+            if entry is not None:
+                entry.add(booking)
+
+    def report(self, event_id, now=None):
+        """booking_report() over the event's bookings"""
+        entry = self._entry(str(event_id))
+        # Copy the two columns the report reads, so bookings can be appended while it is computed
+        with entry.lock:
+            booked_at = entry.columns.booked_at[:]
+            prices = entry.columns.prices[:]
+        return _booking_report(booked_at, prices, now)
+
+    def close(self, event_id):
+        """Drop an event's columns (e.g. once it has ended); a later report reloads them"""
+        with self._lock:
+            self._events.pop(str(event_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
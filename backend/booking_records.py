@@ -0,0 +1,116 @@
+"""
+Compact in-memory booking records.
+
+A booking read as a dict carries eight keys, a fresh copy of repeated strings
+(event id, currency, status) and a 26-character ISO timestamp. BookingColumns
+keeps bookings as parallel typed arrays instead: ids, prices and times are
+machine integers, and event ids, currencies and statuses are interned into
+small lookup tables and stored as codes. Only attendee names and emails remain
+Python strings. `booking(i)` and iteration rebuild the usual dict shape, so
+callers that serialize bookings see no difference.
+"""
+from array import array
+from datetime import datetime, timedelta, timezone
+
+# Prices are stored in hundredths so fractional prices survive as integers
+PRICE_SCALE = 100
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_us(booking_time):
+    """Microseconds since 1970-01-01 for an ISO booking time (naive, as build_booking writes it)"""
+    moment = datetime.fromisoformat(booking_time) if isinstance(booking_time, str) else booking_time
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(epoch_us):
+    return (_EPOCH + timedelta(microseconds=epoch_us)).isoformat()
+
+
+def to_price_units(price):
+    return round((price or 0) * PRICE_SCALE)
+
+
+def from_price_units(units):
+    whole, fraction = divmod(units, PRICE_SCALE)
+    return whole if not fraction else units / PRICE_SCALE
+
+
+class _Interner:
+    """Maps repeated values to small integer codes"""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class BookingColumns:
+    """Bookings stored column-wise in typed arrays"""
+
+    def __init__(self, rows=()):
+        self.ids = array('q')
+        self.event_codes = array('I')
+        self.prices = array('q')         # ticket price * PRICE_SCALE
+        self.currency_codes = array('H')
+        self.booked_at = array('q')      # epoch microseconds
+        self.status_codes = array('H')
+        self.attendee_names = []
+        self.attendee_emails = []
+        self.event_ids = _Interner()
+        self.currencies = _Interner()
+        self.statuses = _Interner()
+        self.extend_rows(rows)
+
+    def append_row(self, row):
+        """Add one booking given as a tuple in booking_store.BOOKING_COLUMNS order"""
+        booking_id, event_id, name, email, price, currency, booking_time, status = row
+        self.ids.append(booking_id)
+        self.event_codes.append(self.event_ids.code(event_id))
+        self.attendee_names.append(name)
+        self.attendee_emails.append(email)
+        self.prices.append(to_price_units(price))
+        self.currency_codes.append(self.currencies.code(currency))
+        self.booked_at.append(to_epoch_us(booking_time))
+        self.status_codes.append(self.statuses.code(status))
+
+    def extend_rows(self, rows):
+        for row in rows:
+            self.append_row(row)
+
+    def append(self, booking):
+        """Add one booking dict (with an 'id')"""
+        self.append_row((booking['id'], booking['event_id'], booking['attendee_name'], booking['attendee_email'],
+                         booking['ticket_price'], booking['currency'], booking['booking_time'], booking['status']))
+
+    def booking(self, index):
+        """The booking at `index` in the same dict shape as BookingStore.iter_bookings"""
+        return {
+            'id': self.ids[index],
+            'event_id': self.event_ids.values[self.event_codes[index]],
+            'attendee_name': self.attendee_names[index],
+            'attendee_email': self.attendee_emails[index],
+            'ticket_price': from_price_units(self.prices[index]),
+            'currency': self.currencies.values[self.currency_codes[index]],
+            'booking_time': from_epoch_us(self.booked_at[index]),
+            'status': self.statuses.values[self.status_codes[index]]
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield self.booking(index)
@@ -0,0 +1,196 @@
+"""
+Durable SQLite booking store.
+
+Replaces the in-process `ticket_bookings` list. The database runs in WAL mode
+with synchronous=NORMAL, so a booking insert is a single short transaction
+that does not block readers (exports, live-sales counters). Connections are
+pooled and reused across request threads; every statement uses a constant SQL
+string, so sqlite3's statement cache keeps them prepared.
+"""
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from booking_records import BookingColumns
+from metrics import timed
+
+BOOKINGS_DB = 'data/bookings.db'
+
+# Idle connections kept for reuse; more are opened on demand under load
+POOL_SIZE = 8
+
+BOOKING_COLUMNS = ('id', 'event_id', 'attendee_name', 'attendee_email', 'ticket_price',
+                   'currency', 'booking_time', 'status')
+
+_INSERT_BOOKING = '''
+    INSERT INTO bookings (event_id, attendee_name, attendee_email, ticket_price, currency, booking_time, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+_SELECT_BOOKINGS = f"SELECT {', '.join(BOOKING_COLUMNS)} FROM bookings"
+
+
+def _row_to_booking(row):
+    return dict(zip(BOOKING_COLUMNS, row))
+
+
+def _insert_params(booking):
+    return (
+        booking['event_id'],
+        booking['attendee_name'],
+        booking['attendee_email'],
+        booking['ticket_price'],
+        booking['currency'],
+        booking['booking_time'],
+        booking['status']
+    )
+
+
+class BookingStore:
+    """Booking repository backed by SQLite"""
+
+    def __init__(self, db_path=BOOKINGS_DB, pool_size=POOL_SIZE):
+        self.db_path = db_path
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=64)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout=5000')
+        return conn
+
+    def _init_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS bookings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_id TEXT,
+                attendee_name TEXT,
+                attendee_email TEXT,
+                ticket_price NUMERIC DEFAULT 0,
+                currency TEXT DEFAULT 'INR',
+                booking_time TEXT NOT NULL,
+                status TEXT DEFAULT 'confirmed'
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_bookings_event_id ON bookings(event_id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_bookings_booking_time ON bookings(booking_time)')
+        conn.commit()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection for the duration of the block"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = self._connect()
+            if not self._initialized:
+                with self._init_lock:
+                    if not self._initialized:
+                        self._init_schema(conn)
+                        self._initialized = True
+
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @timed('booking_insert')
+    def add(self, booking):
+        """Insert a booking and return its assigned id"""
+        with self.connection() as conn:
+            cursor = conn.execute(_INSERT_BOOKING, _insert_params(booking))
+            conn.commit()
+            return cursor.lastrowid
+
+    @timed('booking_insert_batch')
+    def add_many(self, bookings):
+        """Insert bookings in one transaction and return their ids in order"""
+        with self.connection() as conn:
+            ids = [conn.execute(_INSERT_BOOKING, _insert_params(booking)).lastrowid for booking in bookings]
+            conn.commit()
+            return ids
+
+    def iter_bookings(self, event_id=None, start=None, end=None, batch_size=1000):
+        """Yield bookings in id order without loading them all at once
+
+        Optionally filtered by event and by an ISO booking-time range
+        (`start` inclusive, `end` exclusive), served from the indexes.
+        """
+        for row in self.iter_rows(event_id, start, end, batch_size):
+            yield _row_to_booking(row)
+
+    def iter_rows(self, event_id=None, start=None, end=None, batch_size=1000):
+        """Like iter_bookings, but yields raw tuples in BOOKING_COLUMNS order"""
+        conditions, params = [], []
+        if event_id is not None:
+            conditions.append('event_id = ?')
+            params.append(str(event_id))
+        if start:
+            conditions.append('booking_time >= ?')
+            params.append(start)
+        if end:
+            conditions.append('booking_time < ?')
+            params.append(end)
+
+        sql = _SELECT_BOOKINGS
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY id'
+
+        with self.connection() as conn:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def load_columns(self, event_id=None, start=None, end=None):
+        """Load bookings (filtered like iter_bookings) into compact BookingColumns"""
+        return BookingColumns(self.iter_rows(event_id, start, end))
+
+    def recent(self, limit=10):
+        """Most recent bookings, newest first"""
+        with self.connection() as conn:
+            rows = conn.execute(_SELECT_BOOKINGS + ' ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [_row_to_booking(row) for row in rows]
+
+    def totals(self):
+        """(number of bookings, total revenue) across all events"""
+        with self.connection() as conn:
+            count, revenue = conn.execute('SELECT COUNT(*), COALESCE(SUM(ticket_price), 0) FROM bookings').fetchone()
+        return count, revenue
+
+    def counts_by_event(self):
+        """Number of bookings per event id (as strings)"""
+        with self.connection() as conn:
+            rows = conn.execute('SELECT event_id, COUNT(*) FROM bookings GROUP BY event_id').fetchall()
+        return {str(event_id): count for event_id, count in rows}
+
+    def live_sales_summary(self, recent_limit=10):
+        """Live sales counters in the shape of `live_sales_data`"""
+        total_sales, total_revenue = self.totals()
+        return {
+            'total_sales': total_sales,
+            'total_revenue': total_revenue,
+            'recent_bookings': self.recent(recent_limit)
+        }
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,73 @@
+"""
+Running dashboard totals.
+
+Event count, events per status, attendees and revenue (overall and per
+currency) are kept up to date as events are created, change status and sell
+tickets, so /api/dashboard never walks the event catalogue. `rebuild(events)`
+recomputes everything from the events in one pass.
+"""
+import threading
+
+
+class DashboardTotals:
+    """O(1) dashboard statistics maintained incrementally"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.event_count = 0
+        self.attendees = 0
+        self.revenue = 0
+        self.revenue_by_currency = {}
+        self.events_by_status = {}
+
+    def _add(self, event):
+        attendees = event.get('attendees', 0)
+        revenue = event.get('ticketPrice', 0) * attendees
+        currency = event.get('currency', 'INR')
+        status = event.get('status', 'upcoming')
+
+        self.event_count += 1
+        self.attendees += attendees
+        self.revenue += revenue
+        self.revenue_by_currency[currency] = self.revenue_by_currency.get(currency, 0) + revenue
+        self.events_by_status[status] = self.events_by_status.get(status, 0) + 1
+
+    def rebuild(self, events):
+        """Recompute all totals from `events`"""
+        with self._lock:
+            self._reset()
+            for event in events:
+                self._add(event)
+
+    def add_event(self, event):
+        with self._lock:
+            self._add(event)
+
+    def record_sale(self, event, quantity=1):
+        """Count `quantity` tickets sold for `event` at its ticket price"""
+        revenue = event.get('ticketPrice', 0) * quantity
+        currency = event.get('currency', 'INR')
+        with self._lock:
+            self.attendees += quantity
+            self.revenue += revenue
+            self.revenue_by_currency[currency] = self.revenue_by_currency.get(currency, 0) + revenue
+
+    def status_changed(self, old_status, new_status):
+        if old_status == new_status:
+            return
+        with self._lock:
+            self.events_by_status[old_status] = self.events_by_status.get(old_status, 0) - 1
+            self.events_by_status[new_status] = self.events_by_status.get(new_status, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'total_events': self.event_count,
+                'total_revenue': self.revenue,
+                'total_attendees': self.attendees,
+                'revenue_by_currency': dict(self.revenue_by_currency),
+                'events_by_status': {status: count for status, count in self.events_by_status.items() if count}
+            }
@@ -0,0 +1,217 @@
+"""
+Append-only mutation log for live engagement data (polls and Q&A).
+
+Every engagement mutation is appended to the log as one JSON line instead of
+re-serializing the whole engagement dict. The log is periodically compacted
+into the JSON snapshot and replayed on top of it on startup.
+
+Compaction runs on a background thread. Under the log lock it only moves the
+records logged so far to a separate segment file, so appends carry on into a
+fresh log; it then copies the state (each dict and list is copied in one step,
+so concurrent writers can't break the copy) and writes the snapshot from the
+copy. Every record in the segment was applied to the state before it was
+logged, so the snapshot covers it and the segment is deleted afterwards.
+
+Records carry absolute values (e.g. the vote count after the vote), so
+replaying a record that is already reflected in the snapshot is harmless.
+Vote counts only grow, so vote records are applied with max() and concurrent
+votes that reach the log out of order still replay to the right total.
+"""
+import json
+import os
+import shutil
+import threading
+
+from engagement_store import record_allocated_id
+
+ENGAGEMENT_SNAPSHOT_FILE = 'engagement_data.json'
+ENGAGEMENT_LOG_FILE = 'engagement_log.jsonl'
+COMPACTING_SUFFIX = '.compacting'   # Log segment being folded into the snapshot
+
+# Number of appended records after which the log is folded into the snapshot
+COMPACT_EVERY = 1000
+
+
+def _event_bucket(state, event_id):
+    """Get (or create) the engagement dict for an event"""
+    if event_id not in state:
+        state[event_id] = {
+            'polls': [],
+            'qa_questions': [],
+            'live_attendance': 240
+        }
+    return state[event_id]
+
+
+def _find_by_id(items, item_id):
+    return next((item for item in items if item.get('id') == item_id), None)
+
+
+def _copy_state(value):
+    """Deep copy of JSON-like state; dict.copy() and list slicing never see a container mid-change"""
+    if isinstance(value, dict):
+        return {key: _copy_state(item) for key, item in value.copy().items()}
+    if isinstance(value, list):
+        return [_copy_state(item) for item in value[:]]
+    return value
+
+
+def apply_mutation(state, record):
+    """Apply a single log record to the engagement state dict"""
+    op = record.get('op')
+    event = _event_bucket(state, str(record.get('event_id')))
+
+    if op == 'poll_create':
+        poll = record['poll']
+        event['polls'] = [p for p in event['polls'] if p.get('id') != poll['id']]
+        event['polls'].append(poll)
+        record_allocated_id(event, 'last_poll_id', poll['id'])
+
+    elif op == 'poll_vote':
+        poll = _find_by_id(event['polls'], record['poll_id'])
+        if poll is not None:
+            option_votes = poll.setdefault('option_votes', {})
+            option_votes[record['option']] = max(option_votes.get(record['option'], 0), record['votes'])
+            poll['responses'] = max(poll.get('responses', 0), record['responses'])
+
+    elif op == 'poll_delete':
+        event['polls'] = [p for p in event['polls'] if p.get('id') != record['poll_id']]
+
+    elif op == 'qa_create':
+        question = record['question']
+        event['qa_questions'] = [q for q in event['qa_questions'] if q.get('id') != question['id']]
+        event['qa_questions'].append(question)
+        record_allocated_id(event, 'last_question_id', question['id'])
+
+    elif op == 'qa_vote':
+        question = _find_by_id(event['qa_questions'], record['question_id'])
+        if question is not None:
+            question['votes'] = max(question.get('votes', 0), record['votes'])
+
+    elif op == 'qa_answer':
+        question = _find_by_id(event['qa_questions'], record['question_id'])
+        if question is not None:
+            question['answered'] = record['answered']
+
+    elif op == 'qa_delete':
+        event['qa_questions'] = [q for q in event['qa_questions'] if q.get('id') != record['question_id']]
+
+    else:
+        raise ValueError(f"Unknown engagement log operation: {op}")
+
+
+class EngagementLog:
+    """Append-only engagement mutation log with background snapshot compaction"""
+
+    def __init__(self, snapshot_file=ENGAGEMENT_SNAPSHOT_FILE, log_file=ENGAGEMENT_LOG_FILE,
+                 compact_every=COMPACT_EVERY, before_snapshot=None):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file
+        self.segment_file = log_file + COMPACTING_SUFFIX
+        self.compact_every = compact_every
+        self.before_snapshot = before_snapshot  # Called before the state is serialised
+        self.pending = 0
+        self._lock = threading.Lock()           # Guards the log file handle and `pending`
+        self._compact_lock = threading.Lock()   # One compaction at a time
+        self._compacting = False
+        self._fh = None
+
+    def append(self, record, state):
+        """Append one mutation record; every `compact_every` records a background compaction starts"""
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.log_file, 'a', encoding='utf-8')
+            self._fh.write(line + '\n')
+            self._fh.flush()
+            self.pending += 1
+
+            start_compaction = self.pending >= self.compact_every and not self._compacting
+            if start_compaction:
+                self._compacting = True
+
+        if start_compaction:
+            threading.Thread(target=self._compact_in_background, args=(state,),
+                             name='engagement-compaction', daemon=True).start()
+
+    def _compact_in_background(self, state):
+        try:
+            self.compact(state)
+        except Exception as e:
+            print(f"❌ Engagement log compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def compact(self, state):
+        """Write a full snapshot of `state` and drop the log records it covers"""
+        with self._compact_lock:
+            with self._lock:
+                self._rotate()
+                self.pending = 0
+
+            if self.before_snapshot is not None:
+                self.before_snapshot()
+            snapshot = json.dumps(_copy_state(state), indent=2)
+
+            tmp_file = self.snapshot_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_file, self.snapshot_file)
+
+            # Records are idempotent, so a crash before the segment is removed is safe
+            if os.path.exists(self.segment_file):
+                os.remove(self.segment_file)
+
+    def _rotate(self):
+        """Move the records logged so far into the segment file; the next append starts a new log"""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if not os.path.exists(self.log_file):
+            return
+        if os.path.exists(self.segment_file):
+            # A previous compaction failed: keep its records ahead of these ones
+            with open(self.segment_file, 'a', encoding='utf-8') as segment, \
+                    open(self.log_file, 'r', encoding='utf-8') as log:
+                shutil.copyfileobj(log, segment)
+            os.remove(self.log_file)
+        else:
+            os.replace(self.log_file, self.segment_file)
+
+    def load_snapshot(self):
+        """Load the last compacted snapshot, or None if there is none"""
+        if not os.path.exists(self.snapshot_file):
+            return None
+        with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def replay(self, state):
+        """Replay logged mutations on top of `state`; returns the number of records applied
+
+        A segment left by an interrupted compaction holds older records than
+        the log, so it is replayed first.
+        """
+        applied = 0
+        for path in (self.segment_file, self.log_file):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-append; everything before it is intact
+                        break
+                    apply_mutation(state, record)
+                    applied += 1
+        return applied
+
+    def close(self):
+        with self._compact_lock, self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
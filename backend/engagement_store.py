@@ -0,0 +1,152 @@
+"""
+Per-event engagement containers: polls and Q&A questions indexed by id.
+
+Handlers used to find a poll or question by scanning the event's list,
+allocate ids with max(ids) + 1 and delete by rebuilding the list. An
+EventEngagement wraps the event's engagement dict and keeps insertion-ordered
+id -> item dicts as the source of truth, with monotonic id counters, so
+lookups, votes, id allocation and deletes are O(1) dict operations. The lists
+in engagement_data are only brought up to date when they are read: creates
+append to them, but after a delete they are rebuilt from the dicts (in place,
+in insertion order) by `sync()`, which readers call before serialising an
+event's polls or questions (GET endpoints, snapshots, post-event capture).
+The last allocated ids are kept in the engagement dict ('last_poll_id',
+'last_question_id'), so they are saved with the snapshot and an id freed by a
+delete is never handed out again, even after a restart.
+"""
+import threading
+
+
+def record_allocated_id(engagement, counter_key, item_id):
+    """Raise the engagement dict's persisted id counter to cover `item_id`"""
+    if isinstance(item_id, int) and item_id > engagement.get(counter_key, 0):
+        engagement[counter_key] = item_id
+
+
+class _IndexedItems:
+    """Polls or questions by id (in insertion order), their engagement list and persisted id counter"""
+
+    __slots__ = ('engagement', 'counter_key', 'items', 'by_id', 'stale')
+
+    def __init__(self, engagement, list_key, counter_key):
+        self.engagement = engagement
+        self.counter_key = counter_key
+        self.items = engagement.setdefault(list_key, [])
+        self.by_id = {item.get('id'): item for item in self.items}
+        self.stale = False      # True while the list still holds deleted items
+        for item_id in self.by_id:
+            record_allocated_id(engagement, counter_key, item_id)
+
+    @property
+    def last_id(self):
+        return self.engagement.get(self.counter_key, 0)
+
+    def add(self, item):
+        self.items.append(item)
+        self.by_id[item['id']] = item
+        record_allocated_id(self.engagement, self.counter_key, item['id'])
+
+    def remove(self, item_id):
+        item = self.by_id.pop(item_id, None)
+        if item is not None:
+            self.stale = True
+        return item
+
+    def sync(self):
+        """Rebuild the engagement list from the id index if items were deleted"""
+        if self.stale:
+            self.items[:] = self.by_id.values()
+            self.stale = False
+
+
+class EventEngagement:
+    """Id-indexed polls and questions of one event"""
+
+    def __init__(self, engagement):
+        self._lock = threading.Lock()
+        self.engagement = engagement
+        self._polls = _IndexedItems(engagement, 'polls', 'last_poll_id')
+        self._questions = _IndexedItems(engagement, 'qa_questions', 'last_question_id')
+
+    def sync(self):
+        """Bring the engagement dict's poll and question lists up to date with deletes"""
+        with self._lock:
+            self._polls.sync()
+            self._questions.sync()
+
+    # --- polls -----------------------------------------------------------
+
+    def get_poll(self, poll_id):
+        return self._polls.by_id.get(poll_id)
+
+    def create_poll(self, make_poll):
+        """Allocate the next poll id, build the poll with `make_poll(id)` and add it"""
+        with self._lock:
+            poll = make_poll(self._polls.last_id + 1)
+            self._polls.add(poll)
+        return poll
+
+    def delete_poll(self, poll_id):
+        """Remove a poll; returns it, or None if there is no such poll"""
+        with self._lock:
+            return self._polls.remove(poll_id)
+
+    # --- questions -------------------------------------------------------
+
+    def get_question(self, question_id):
+        return self._questions.by_id.get(question_id)
+
+    def create_question(self, make_question):
+        """Allocate the next question id, build it with `make_question(id)` and add it"""
+        with self._lock:
+            question = make_question(self._questions.last_id + 1)
+            self._questions.add(question)
+        return question
+
+    def upvote_question(self, question_id):
+        """Add one vote to a question; returns the new vote count, or None if it does not exist"""
+        with self._lock:
+            question = self._questions.by_id.get(question_id)
+            if question is None:
+                return None
+            question['votes'] = question.get('votes', 0) + 1
+            return question['votes']
+
+    def delete_question(self, question_id):
+        """Remove a question; returns it, or None if there is no such question"""
+        with self._lock:
+            return self._questions.remove(question_id)
+
+
+class EngagementStore:
+    """Lazily built EventEngagement per event id"""
+
+    def __init__(self):
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def get(self, event_id, engagement):
+        """Get the event's container, building it around `engagement` on first use"""
+        event_id = str(event_id)
+        container = self._events.get(event_id)
+        if container is None or container.engagement is not engagement:
+            with self._lock:
+                container = self._events.get(event_id)
+                if container is None or container.engagement is not engagement:
+                    container = EventEngagement(engagement)
+                    self._events[event_id] = container
+        return container
+
+    def sync(self, event_id=None):
+        """Bring one event's (or every event's) engagement lists up to date with deletes"""
+        if event_id is None:
+            containers = list(self._events.values())
+        else:
+            containers = [self._events.get(str(event_id))]
+        for container in containers:
+            if container is not None:
+                container.sync()
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
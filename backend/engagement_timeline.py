@@ -0,0 +1,213 @@
+"""
+Per-event engagement timeline: a bounded ring buffer of raw activity plus
+per-minute rollups.
+
+Every vote, question and attendance change is appended to the event's ring
+buffer and counted into its minute bucket as it happens, so a trend is read
+straight from the buckets (O(buckets)) and raw activity is never rescanned.
+Buckets changed since the last flush are written in batches by a background
+thread through the `writer` callback. `loader` reads flushed rollups back:
+an event's timeline is seeded from them when it is first held in memory
+(e.g. after a restart), and they serve the trend of events no longer held.
+"""
+import threading
+from collections import deque
+from datetime import datetime
+
+MAX_RECENT_ACTIVITIES = 1000   # Raw activities kept per event
+MAX_BUCKETS = 24 * 60          # One day of minute buckets per event
+FLUSH_INTERVAL_SECONDS = 30
+
+# Engagement log operations that count as timeline activity
+MUTATION_ACTIVITIES = {
+    'poll_vote': 'poll_response',
+    'qa_create': 'qa_question',
+    'qa_vote': 'qa_vote'
+}
+ACTIVITY_TYPES = ('poll_response', 'qa_question', 'qa_vote', 'attendance_change')
+
+
+class _MinuteBucket:
+    __slots__ = ('counts', 'attendance')
+
+    def __init__(self, attendance):
+        self.counts = dict.fromkeys(ACTIVITY_TYPES, 0)
+        self.attendance = attendance
+
+
+class _EventTimeline:
+    __slots__ = ('lock', 'recent', 'buckets', 'dirty')
+
+    def __init__(self, max_activities):
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=max_activities)
+        self.buckets = {}  # 'YYYY-MM-DDTHH:MM' -> _MinuteBucket, in time order
+        self.dirty = set()
+
+
+def _rollup_bucket(counts, attendance):
+    bucket = _MinuteBucket(attendance)
+    bucket.counts.update(counts)
+    return bucket
+
+
+def _bucket_to_point(minute, bucket):
+    return {
+        'time': minute[11:16],
+        'minute': minute,
+        'attendees': bucket.attendance,
+        'poll_responses': bucket.counts['poll_response'],
+        'qa_questions': bucket.counts['qa_question'],
+        'qa_votes': bucket.counts['qa_vote']
+    }
+
+
+class EngagementTimeline:
+    """Ring-buffered engagement activity with incrementally maintained minute rollups"""
+
+    def __init__(self, writer=None, loader=None, max_activities=MAX_RECENT_ACTIVITIES, max_buckets=MAX_BUCKETS):
+        self.writer = writer    # writer(rows) persists [(event_id, minute, counts, attendance), ...]
+        self.loader = loader    # loader(event_id) -> flushed [(minute, counts, attendance), ...], oldest first
+        self.max_activities = max_activities
+        self.max_buckets = max_buckets
+        self._events = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _timeline(self, event_id, create=False):
+        key = str(event_id)
+        timeline = self._events.get(key)
+        if timeline is None and create:
+            flushed = self._load(key)
+            with self._lock:
+                timeline = self._events.get(key)
+                if timeline is None:
+                    timeline = self._events[key] = _EventTimeline(self.max_activities)
+                    # Continue from the flushed minutes so new activity adds to them instead of replacing them
+                    for minute, counts, attendance in flushed[-self.max_buckets:]:
+                        timeline.buckets[minute] = _rollup_bucket(counts, attendance)
+        return timeline
+
+    def _load(self, event_id):
+        if self.loader is None:
+            return []
+        try:
+            return self.loader(event_id)
+        except Exception as e:
+            print(f"Error loading engagement timeline for event {event_id}: {e}")
+            return []
+
+    def record(self, event_id, activity_type, attendance=0, at=None):
+        """Add one activity to the event's ring buffer and its minute bucket"""
+        at = at or datetime.now()
+        minute = at.strftime('%Y-%m-%dT%H:%M')
+        timeline = self._timeline(event_id, create=True)
+
+        with timeline.lock:
+            timeline.recent.append((at.isoformat(), activity_type))
+            bucket = timeline.buckets.get(minute)
+            if bucket is None:
+                bucket = timeline.buckets[minute] = _MinuteBucket(attendance)
+                if len(timeline.buckets) > self.max_buckets:
+                    oldest = next(iter(timeline.buckets))
+                    # An unflushed bucket is written before it is dropped
+                    if oldest in timeline.dirty and self.writer:
+                        self.writer([(str(event_id), oldest, timeline.buckets[oldest].counts,
+                                      timeline.buckets[oldest].attendance)])
+                        timeline.dirty.discard(oldest)
+                    del timeline.buckets[oldest]
+            bucket.counts[activity_type] += 1
+            bucket.attendance = attendance
+            timeline.dirty.add(minute)
+
+    def record_mutation(self, record, attendance=0):
+        """Record an engagement log mutation if it is a timeline activity"""
+        activity_type = MUTATION_ACTIVITIES.get(record.get('op'))
+        if activity_type:
+            self.record(record['event_id'], activity_type, attendance)
+
+    def recent(self, event_id, limit=50):
+        """Most recent raw activities of an event, newest first"""
+        timeline = self._timeline(event_id)
+        if timeline is None:
+            return []
+        with timeline.lock:
+            items = list(timeline.recent)[-limit:]
+        return [{'timestamp': timestamp, 'activity_type': activity_type}
+                for timestamp, activity_type in reversed(items)]
+
+    def trend(self, event_id):
+        """Per-minute activity and attendance points, oldest first"""
+        timeline = self._timeline(event_id)
+        if timeline is None:
+            return [_bucket_to_point(minute, _rollup_bucket(counts, attendance))
+                    for minute, counts, attendance in self._load(str(event_id))]
+        with timeline.lock:
+            return [_bucket_to_point(minute, bucket) for minute, bucket in timeline.buckets.items()]
+
+    def _take_dirty(self, event_ids):
+        rows = []
+        for event_id in event_ids:
+            timeline = self._events.get(event_id)
+            if timeline is None:
+                continue
+            with timeline.lock:
+                for minute in sorted(timeline.dirty):
+                    bucket = timeline.buckets[minute]
+                    rows.append((event_id, minute, dict(bucket.counts), bucket.attendance))
+                timeline.dirty.clear()
+        return rows
+
+    def _mark_dirty(self, rows):
+        for event_id, minute, _, _ in rows:
+            timeline = self._events.get(event_id)
+            if timeline is not None:
+                with timeline.lock:
+                    if minute in timeline.buckets:
+                        timeline.dirty.add(minute)
+
+    def flush(self, event_ids=None):
+        """Write buckets changed since the last flush in one batch; returns the number written"""
+        if self.writer is None:
+            return 0
+        with self._flush_lock:
+            rows = self._take_dirty(list(self._events) if event_ids is None else [str(e) for e in event_ids])
+            if not rows:
+                return 0
+            try:
+                self.writer(rows)
+            except Exception:
+                self._mark_dirty(rows)  # Retried on the next flush
+                raise
+            return len(rows)
+
+    def close(self, event_id):
+        """Flush an event's buckets and release its in-memory timeline (e.g. when it ends)"""
+        self.flush([event_id])
+        with self._lock:
+            self._events.pop(str(event_id), None)
+
+    def start(self, interval=FLUSH_INTERVAL_SECONDS):
+        """Flush changed buckets every `interval` seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, args=(interval,),
+                                        name='timeline-flusher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _flush_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error flushing engagement timeline: {e}")
@@ -0,0 +1,50 @@
+"""
+Per-event engagement version numbers with long-poll waiting.
+
+Every engagement mutation bumps its event's version. Long-poll requests block
+on the event's condition variable until the version moves past the client's
+last-seen value or the timeout expires, so idle watchers cost no CPU and see
+changes as soon as they happen.
+"""
+import threading
+
+
+class EngagementVersions:
+    """Monotonically increasing version per event, with wait-for-change"""
+
+    def __init__(self):
+        self._versions = {}
+        self._conditions = {}
+        self._lock = threading.Lock()
+
+    def _condition(self, event_id):
+        with self._lock:
+            condition = self._conditions.get(event_id)
+            if condition is None:
+                condition = threading.Condition()
+                self._conditions[event_id] = condition
+                self._versions.setdefault(event_id, 0)
+            return condition
+
+    def current(self, event_id):
+        return self._versions.get(str(event_id), 0)
+
+    def bump(self, event_id):
+        """Advance the event's version and wake its waiters"""
+        event_id = str(event_id)
+        condition = self._condition(event_id)
+        with condition:
+            self._versions[event_id] += 1
+            condition.notify_all()
+            return self._versions[event_id]
+
+    def wait_for_change(self, event_id, since, timeout):
+        """Block until the version differs from `since` or `timeout` seconds pass
+
+        A version lower than `since` (the server restarted) also counts as a change.
+        """
+        event_id = str(event_id)
+        condition = self._condition(event_id)
+        with condition:
+            condition.wait_for(lambda: self._versions[event_id] != since, timeout=timeout)
+            return self._versions[event_id]
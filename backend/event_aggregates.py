@@ -0,0 +1,217 @@
+"""
+Incrementally maintained per-event engagement aggregates.
+
+Post-event analytics used to rescan every poll, option and question on each
+request. An EventAggregate is built once from the engagement data and then
+kept current from the same mutation records that go to the engagement log,
+so each vote, question, answer or delete costs O(1) (O(options) for a poll
+vote) and the analytics endpoint only assembles precomputed pieces.
+"""
+import itertools
+import threading
+
+from qa_ranking import RankHeap
+
+
+def qa_priority_level(votes):
+    """Priority bucket shown in post-event Q&A analytics"""
+    if votes > 15:
+        return 'high'
+    elif votes > 5:
+        return 'medium'
+    return 'low'
+
+
+class EventAggregate:
+    """Running engagement totals and cached analytics rows for one event"""
+
+    def __init__(self, engagement):
+        self._lock = threading.Lock()
+        self.polls = {}        # poll_id -> {'question', 'options', 'option_votes', 'responses', 'entry'}
+        self.questions = {}    # question_id -> cached qa analytics row (insertion ordered)
+        self.total_poll_responses = 0
+        self.total_answered = 0
+        self._by_votes = RankHeap()   # question_id -> (-vote_count, insertion sequence)
+        self._question_sequence = {}
+        self._sequence = itertools.count()
+
+        for poll in engagement.get('polls', []):
+            self._add_poll(poll)
+        for question in engagement.get('qa_questions', []):
+            self._add_question(question)
+
+    # --- polls -----------------------------------------------------------
+
+    def _add_poll(self, poll):
+        state = {
+            'question': poll.get('question'),
+            'options': list(poll.get('options') or []),
+            'option_votes': dict(poll.get('option_votes') or {}),
+            'responses': poll.get('responses', 0),
+            'entry': None
+        }
+        self.polls[poll.get('id')] = state
+        self.total_poll_responses += state['responses']
+        self._refresh_poll_entry(poll.get('id'), state)
+
+    def _refresh_poll_entry(self, poll_id, state):
+        if not (state['options'] and state['option_votes']):
+            state['entry'] = None
+            return
+
+        total_votes = state['responses']
+        state['entry'] = {
+            'id': poll_id,
+            'poll_question': state['question'],
+            'poll_type': 'custom',
+            'total_responses': total_votes,
+            'options': [
+                {
+                    'text': option,
+                    'votes': state['option_votes'].get(option, 0),
+                    'percentage': round((state['option_votes'].get(option, 0) / max(total_votes, 1)) * 100, 1)
+                }
+                for option in state['options']
+            ]
+        }
+
+    def _poll_vote(self, poll_id, option, votes, responses):
+        state = self.polls.get(poll_id)
+        if state is None:
+            return
+        state['option_votes'][option] = max(state['option_votes'].get(option, 0), votes)
+        if responses > state['responses']:
+            self.total_poll_responses += responses - state['responses']
+            state['responses'] = responses
+        self._refresh_poll_entry(poll_id, state)
+
+    def _remove_poll(self, poll_id):
+        state = self.polls.pop(poll_id, None)
+        if state is not None:
+            self.total_poll_responses -= state['responses']
+
+    # --- questions -------------------------------------------------------
+
+    def _add_question(self, question):
+        question_id = question.get('id')
+        if question_id in self.questions:
+            self._remove_question(question_id)
+
+        votes = question.get('votes', 0)
+        answered = bool(question.get('answered', False))
+        self.questions[question_id] = {
+            'id': question_id,
+            'question_text': question.get('question'),
+            'category': 'General',
+            'vote_count': votes,
+            'is_answered': answered,
+            'priority_level': qa_priority_level(votes),
+            'response_time': 120  # Mock response time
+        }
+        if answered:
+            self.total_answered += 1
+        self._question_sequence[question_id] = next(self._sequence)
+        self._by_votes.set(question_id, (-votes, self._question_sequence[question_id]))
+
+    def _question_vote(self, question_id, votes):
+        row = self.questions.get(question_id)
+        if row is None or votes <= row['vote_count']:
+            return
+        row['vote_count'] = votes
+        row['priority_level'] = qa_priority_level(votes)
+        self._by_votes.set(question_id, (-votes, self._question_sequence[question_id]))
+
+    def _question_answered(self, question_id, answered):
+        row = self.questions.get(question_id)
+        if row is None or row['is_answered'] == answered:
+            return
+        row['is_answered'] = answered
+        self.total_answered += 1 if answered else -1
+
+    def _remove_question(self, question_id):
+        row = self.questions.pop(question_id, None)
+        if row is None:
+            return
+        if row['is_answered']:
+            self.total_answered -= 1
+        self._question_sequence.pop(question_id, None)
+        self._by_votes.discard(question_id)
+
+    def _top_question(self):
+        # Most votes, first asked among ties (like a max() scan), read from the ranking heap
+        top_ids = self._by_votes.top(1)
+        return self.questions[top_ids[0]]['question_text'] if top_ids else 'N/A'
+
+    # --- mutation records ------------------------------------------------
+
+    def apply(self, record):
+        """Apply an engagement log record (see engagement_log.apply_mutation)"""
+        op = record.get('op')
+        with self._lock:
+            if op == 'poll_create':
+                self._remove_poll(record['poll'].get('id'))
+                self._add_poll(record['poll'])
+            elif op == 'poll_vote':
+                self._poll_vote(record['poll_id'], record['option'], record['votes'], record['responses'])
+            elif op == 'poll_delete':
+                self._remove_poll(record['poll_id'])
+            elif op == 'qa_create':
+                self._add_question(record['question'])
+            elif op == 'qa_vote':
+                self._question_vote(record['question_id'], record['votes'])
+            elif op == 'qa_answer':
+                self._question_answered(record['question_id'], record['answered'])
+            elif op == 'qa_delete':
+                self._remove_question(record['question_id'])
+
+    def summary(self, live_attendance):
+        """Snapshot of the aggregates used by post-event analytics"""
+        with self._lock:
+            polls_analytics = []
+            for state in self.polls.values():
+                if state['entry'] is not None:
+                    entry = dict(state['entry'])
+                    entry['response_rate'] = round((state['responses'] / max(live_attendance, 1)) * 100, 1)
+                    polls_analytics.append(entry)
+
+            first_poll = next(iter(self.polls.values()), None)
+            return {
+                'total_polls': len(self.polls),
+                'total_poll_responses': self.total_poll_responses,
+                'total_qa_questions': len(self.questions),
+                'total_qa_answered': self.total_answered,
+                'polls_analytics': polls_analytics,
+                'qa_analytics': [dict(row) for row in self.questions.values()],
+                'most_engaging_poll': first_poll['question'] if first_poll else 'N/A',
+                'top_question': self._top_question()
+            }
+
+
+class EventAggregates:
+    """Lazily built EventAggregate per event id"""
+
+    def __init__(self):
+        self._aggregates = {}
+        self._lock = threading.Lock()
+
+    def get(self, event_id, engagement):
+        """Get the event's aggregate, building it from `engagement` on first use"""
+        event_id = str(event_id)
+        aggregate = self._aggregates.get(event_id)
+        if aggregate is None:
+            with self._lock:
+                aggregate = self._aggregates.get(event_id)
+                if aggregate is None:
+                    aggregate = EventAggregate(engagement)
+                    self._aggregates[event_id] = aggregate
+        return aggregate
+
+    def apply(self, record):
+        """Feed a mutation record to the event's aggregate, if it has been built"""
+        aggregate = self._aggregates.get(str(record.get('event_id')))
+        if aggregate is not None:
+            aggregate.apply(record)
+
+    def clear(self):
+        with self._lock:
+            self._aggregates.clear()
@@ -2,16 +2,131 @@
 import sqlite3
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
+from event_registry import EventRegistry
+from text_classifier import classifier
 
-def init_event_analytics_db():
-    """Initialize the event analytics database with comprehensive tables"""
-    # Create data directory if it doesn't exist
-    os.makedirs('data', exist_ok=True)
-    
-    conn = sqlite3.connect('data/event_analytics.db')
-    cursor = conn.cursor()
+ANALYTICS_DB = 'data/event_analytics.db'
+
+# Archived metrics that cross-event queries may rank events by (each has an index)
+RANKABLE_METRICS = ('engagement_rate', 'total_revenue', 'total_tickets_sold', 'satisfaction_score',
+                    'conversion_rate', 'nps_score')
+
+_connections = {}
+_connection_locks = {'write': threading.Lock(), 'read': threading.Lock()}
+
+def _open_connection():
+    os.makedirs(os.path.dirname(ANALYTICS_DB), exist_ok=True)
+    conn = sqlite3.connect(ANALYTICS_DB, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')  # 64 MB
+    conn.execute('PRAGMA busy_timeout=5000')
+    return conn
+
+@contextmanager
+def _shared_connection(role):
+    with _connection_locks[role]:
+        conn = _connections.get(role)
+        if conn is None:
+            conn = _connections[role] = _open_connection()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+
+def analytics_connection():
+    """Borrow the shared analytics connection (one writer at a time)
     
+    The connection is opened once and tuned for bulk loads: WAL journal,
+    synchronous=NORMAL, in-memory temp tables and a larger page cache.
+    """
+    return _shared_connection('write')
+
+def analytics_read_connection():
+    """Borrow the shared read-only connection; with WAL, reads never wait for a capture in progress"""
+    return _shared_connection('read')
+
+def init_event_analytics_db():
+    """Initialize the event analytics database and apply pending schema migrations"""
+    with analytics_connection() as conn:
+        applied = migrate_analytics_db(conn)
+    print(f"✅ Event analytics database initialized successfully (schema v{applied})")
+
+def _add_query_indexes(cursor):
+    """Index event_id on every detail table and the rankable metrics, and add per-event category counts"""
+    for table, columns in (('poll_analytics', 'event_id, poll_id'),
+                           ('poll_options_analytics', 'event_id, poll_id'),
+                           ('qa_analytics', 'event_id'),
+                           ('engagement_timeline', 'event_id, timestamp'),
+                           ('sentiment_analysis', 'event_id'),
+                           ('event_insights', 'event_id')):
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_event_id ON {table}({columns})')
+    for metric in RANKABLE_METRICS:
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_events_analytics_{metric} ON events_analytics({metric})')
+    
+    # Q&A category counts rolled up per event, plus running totals across all
+    # events, both maintained at capture time so category queries never scan questions
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS qa_category_counts (
+            event_id TEXT NOT NULL,
+            category TEXT NOT NULL,
+            question_count INTEGER DEFAULT 0,
+            vote_count INTEGER DEFAULT 0,
+            PRIMARY KEY (event_id, category)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS qa_category_totals (
+            category TEXT PRIMARY KEY,
+            question_count INTEGER DEFAULT 0,
+            vote_count INTEGER DEFAULT 0,
+            event_count INTEGER DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO qa_category_counts (event_id, category, question_count, vote_count)
+        SELECT event_id, category, COUNT(*), COALESCE(SUM(vote_count), 0) FROM qa_analytics
+        GROUP BY event_id, category
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO qa_category_totals (category, question_count, vote_count, event_count)
+        SELECT category, SUM(question_count), SUM(vote_count), COUNT(*) FROM qa_category_counts
+        GROUP BY category
+    ''')
+
+def _adjust_category_totals(cursor, event_id, sign):
+    """Add (sign=1) or remove (sign=-1) an event's category counts from the cross-event totals"""
+    rows = cursor.execute(
+        'SELECT category, question_count, vote_count FROM qa_category_counts WHERE event_id = ?',
+        (str(event_id),)
+    ).fetchall()
+    cursor.executemany('''
+        INSERT INTO qa_category_totals (category, question_count, vote_count, event_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(category) DO UPDATE SET
+            question_count = question_count + excluded.question_count,
+            vote_count = vote_count + excluded.vote_count,
+            event_count = event_count + excluded.event_count
+    ''', [(category, sign * questions, sign * votes, sign) for category, questions, votes in rows])
+
+def migrate_analytics_db(conn):
+    """Apply pending migrations, each in its own transaction; returns the schema version"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, migration in enumerate(SCHEMA_MIGRATIONS[version:], start=version + 1):
+        conn.execute('BEGIN')
+        migration(conn.cursor())
+        conn.execute(f'PRAGMA user_version = {number}')
+        conn.commit()
+    return len(SCHEMA_MIGRATIONS)
+
+def _create_tables(cursor):
+    """Create the analytics tables if they do not exist"""
     # Main events table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS events_analytics (
@@ -146,31 +261,56 @@ def init_event_analytics_db():
             FOREIGN KEY (event_id) REFERENCES events_analytics(event_id)
         )
     ''')
-    
-    conn.commit()
-    conn.close()
-    print("✅ Event analytics database initialized successfully")
+
+def _add_timeline_rollup_key(cursor):
+    """One engagement_timeline row per event, minute and activity type, so rollups can be upserted"""
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_engagement_timeline_rollup
+        ON engagement_timeline(event_id, timestamp, activity_type)
+    ''')
+
+# Applied in order; PRAGMA user_version records how many have run
+SCHEMA_MIGRATIONS = [_create_tables, _add_query_indexes, _add_timeline_rollup_key]
+
+def write_timeline_rollups(rows):
+    """Upsert minute rollups [(event_id, minute, counts, attendance), ...] into engagement_timeline"""
+    with analytics_connection() as conn:
+        conn.executemany('''
+            INSERT INTO engagement_timeline (event_id, timestamp, activity_type, activity_data, attendance_at_time)
+            VALUES (?, ?, 'minute_rollup', ?, ?)
+            ON CONFLICT(event_id, timestamp, activity_type) DO UPDATE SET
+                activity_data = excluded.activity_data,
+                attendance_at_time = excluded.attendance_at_time
+        ''', [(event_id, minute, json.dumps(counts), attendance) for event_id, minute, counts, attendance in rows])
+        conn.commit()
+
+def load_timeline_rollups(event_id):
+    """Flushed minute rollups of an event as [(minute, counts, attendance), ...], oldest first"""
+    try:
+        with analytics_read_connection() as conn:
+            rows = conn.execute('''
+                SELECT timestamp, activity_data, attendance_at_time FROM engagement_timeline
+                WHERE event_id = ? AND activity_type = 'minute_rollup'
+                ORDER BY timestamp
+            ''', (str(event_id),)).fetchall()
+    except sqlite3.OperationalError:
+        return []  # Analytics schema not created yet (init_event_analytics_db has not run): nothing flushed
+    
+    return [(minute, json.loads(activity_data or '{}'), attendance) for minute, activity_data, attendance in rows]
 
 def capture_event_data_on_completion(event_id, events_data, engagement_data, tickets_data):
-    """Capture comprehensive event data when event ends"""
+    """Capture comprehensive event data when event ends
+    
+    All rows (event summary, polls, options, Q&A, insights and sentiment) are
+    built up front and written with executemany in a single transaction.
+    """
     try:
+        start = time.perf_counter()
+        
         # Get event data from various sources
         event_data = get_complete_event_data(event_id, events_data, engagement_data, tickets_data)
         
-        # Process and insert into analytics database
-        conn = sqlite3.connect('data/event_analytics.db')
-        cursor = conn.cursor()
-        
-        # Insert main event analytics
-        cursor.execute('''
-            INSERT OR REPLACE INTO events_analytics (
-                event_id, event_title, event_date, event_status, completed_at,
-                total_capacity, total_tickets_sold, total_revenue, ticket_price, currency,
-                live_attendance, peak_attendance, avg_attendance, attendance_duration_minutes,
-                total_polls, total_poll_responses, total_qa_questions, total_qa_answered,
-                engagement_rate, conversion_rate, satisfaction_score, nps_score, recommendation_rate
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        event_row = (
             event_data['event_id'],
             event_data['event_title'],
             event_data['event_date'],
@@ -194,87 +334,118 @@ def capture_event_data_on_completion(event_id, events_data, engagement_data, tic
             event_data['satisfaction_score'],
             event_data['nps_score'],
             event_data['recommendation_rate']
-        ))
+        )
         
-        # Insert poll analytics
+        now = datetime.now().isoformat()
+        poll_rows = []
+        option_rows = []
         for poll in event_data['polls']:
-            cursor.execute('''
-                INSERT INTO poll_analytics (
-                    event_id, poll_id, poll_question, poll_type, total_responses,
-                    created_at, response_rate, most_popular_option, most_popular_percentage
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            poll_rows.append((
                 event_id,
                 poll['id'],
                 poll['question'],
                 poll.get('type', 'multiple_choice'),
                 poll.get('responses', 0),
-                poll.get('created', datetime.now().isoformat()),
+                poll.get('created', now),
                 poll.get('response_rate', 0),
                 poll.get('most_popular_option', ''),
                 poll.get('most_popular_percentage', 0)
             ))
             
-            # Insert poll options
             if 'options' in poll and 'option_votes' in poll:
+                total_votes = poll.get('responses', 0)
                 for option in poll['options']:
                     votes = poll['option_votes'].get(option, 0)
-                    total_votes = poll.get('responses', 0)
                     percentage = (votes / total_votes * 100) if total_votes > 0 else 0
-                    
-                    cursor.execute('''
-                        INSERT INTO poll_options_analytics (
-                            event_id, poll_id, option_text, vote_count, percentage
-                        ) VALUES (?, ?, ?, ?, ?)
-                    ''', (event_id, poll['id'], option, votes, percentage))
+                    option_rows.append((event_id, poll['id'], option, votes, percentage))
         
-        # Insert Q&A analytics
-        for qa in event_data['qa_questions']:
-            category = categorize_question_for_db(qa['question'])
-            sentiment = analyze_question_sentiment(qa['question'])
-            priority = determine_priority_level(qa.get('votes', 0))
-            
-            cursor.execute('''
-                INSERT INTO qa_analytics (
-                    event_id, question_id, question_text, category, sentiment,
-                    priority_level, vote_count, is_answered, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        # Each question is classified once; the sentiment rows below reuse the results
+        qa_classifications = classifier.classify_many(qa['question'] for qa in event_data['qa_questions'])
+        qa_rows = [
+            (
                 event_id,
                 qa['id'],
                 qa['question'],
-                category,
-                sentiment,
-                priority,
+                classification.category,
+                classification.question_sentiment,
+                determine_priority_level(qa.get('votes', 0)),
                 qa.get('votes', 0),
                 qa.get('answered', False),
-                qa.get('timestamp', datetime.now().isoformat())
-            ))
+                qa.get('timestamp', now)
+            )
+            for qa, classification in zip(event_data['qa_questions'], qa_classifications)
+        ]
         
-        # Generate and insert insights
-        insights = generate_event_insights(event_data)
-        for insight in insights:
-            cursor.execute('''
-                INSERT INTO event_insights (
-                    event_id, insight_type, insight_category, insight_text,
-                    confidence_score, supporting_data
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
+        insight_rows = [
+            (
                 event_id,
                 insight['type'],
                 insight['category'],
                 insight['text'],
                 insight['confidence'],
                 json.dumps(insight['supporting_data'])
-            ))
-        
-        # Perform sentiment analysis
-        perform_comprehensive_sentiment_analysis(event_id, event_data)
+            )
+            for insight in generate_event_insights(event_data)
+        ]
         
-        conn.commit()
-        conn.close()
+        with analytics_connection() as conn:
+            cursor = conn.cursor()
+            
+            # Re-capturing an event (e.g. a retried archival job) replaces its earlier rows
+            _adjust_category_totals(cursor, event_id, -1)
+            for table in ('poll_analytics', 'poll_options_analytics', 'qa_analytics',
+                          'qa_category_counts', 'event_insights', 'sentiment_analysis'):
+                cursor.execute(f'DELETE FROM {table} WHERE event_id = ?', (str(event_id),))
+            
+            cursor.execute('''
+                INSERT OR REPLACE INTO events_analytics (
+                    event_id, event_title, event_date, event_status, completed_at,
+                    total_capacity, total_tickets_sold, total_revenue, ticket_price, currency,
+                    live_attendance, peak_attendance, avg_attendance, attendance_duration_minutes,
+                    total_polls, total_poll_responses, total_qa_questions, total_qa_answered,
+                    engagement_rate, conversion_rate, satisfaction_score, nps_score, recommendation_rate
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', event_row)
+            cursor.executemany('''
+                INSERT INTO poll_analytics (
+                    event_id, poll_id, poll_question, poll_type, total_responses,
+                    created_at, response_rate, most_popular_option, most_popular_percentage
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', poll_rows)
+            cursor.executemany('''
+                INSERT INTO poll_options_analytics (
+                    event_id, poll_id, option_text, vote_count, percentage
+                ) VALUES (?, ?, ?, ?, ?)
+            ''', option_rows)
+            cursor.executemany('''
+                INSERT INTO qa_analytics (
+                    event_id, question_id, question_text, category, sentiment,
+                    priority_level, vote_count, is_answered, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', qa_rows)
+            cursor.execute('''
+                INSERT INTO qa_category_counts (event_id, category, question_count, vote_count)
+                SELECT event_id, category, COUNT(*), COALESCE(SUM(vote_count), 0) FROM qa_analytics
+                WHERE event_id = ? GROUP BY category
+            ''', (str(event_id),))
+            _adjust_category_totals(cursor, event_id, 1)
+            cursor.executemany('''
+                INSERT INTO event_insights (
+                    event_id, insight_type, insight_category, insight_text,
+                    confidence_score, supporting_data
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', insight_rows)
+            
+            # Sentiment rows go into the same transaction
+            sentiment_rows = perform_comprehensive_sentiment_analysis(event_id, event_data, conn,
+                                                                     qa_classifications)
+            
+            conn.commit()
         
-        print(f"✅ Event data captured successfully for event {event_id}")
+        total_rows = 1 + len(poll_rows) + len(option_rows) + len(qa_rows) + len(insight_rows) + sentiment_rows
+        elapsed = time.perf_counter() - start
+        print(f"✅ Event data captured successfully for event {event_id}: "
+              f"{total_rows} rows in {elapsed:.2f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s)")
         return True
         
     except Exception as e:
@@ -283,8 +454,10 @@ def capture_event_data_on_completion(event_id, events_data, engagement_data, tic
 
 def get_complete_event_data(event_id, events_data, engagement_data, tickets_data):
     """Gather all event data from various sources"""
-    # Get basic event info
-    event = next((e for e in events_data if e['id'] == event_id), {})
+    # Get basic event info (events_data is an EventRegistry; plain lists are indexed once)
+    if not isinstance(events_data, EventRegistry):
+        events_data = EventRegistry(events_data)
+    event = events_data.get(event_id, {})
     
     # Get engagement data
     engagement = engagement_data.get(str(event_id), {})
@@ -334,39 +507,11 @@ def get_complete_event_data(event_id, events_data, engagement_data, tickets_data
 # Helper functions
 def categorize_question_for_db(question):
     """Categorize questions for database storage"""
-    question_lower = question.lower()
-    
-    categories = {
-        'technical': ['technical', 'platform', 'tool', 'software', 'system', 'bug', 'error'],
-        'content': ['topic', 'subject', 'content', 'session', 'speaker', 'presentation'],
-        'engagement': ['engage', 'audience', 'interaction', 'participate', 'involve'],
-        'logistics': ['time', 'schedule', 'venue', 'location', 'registration', 'access'],
-        'feedback': ['feedback', 'opinion', 'suggestion', 'improve', 'better', 'rate'],
-        'future': ['future', 'next', 'upcoming', 'plan', 'roadmap', 'trend'],
-        'business': ['business', 'strategy', 'revenue', 'roi', 'profit', 'cost']
-    }
-    
-    for category, keywords in categories.items():
-        if any(keyword in question_lower for keyword in keywords):
-            return category
-    
-    return 'general'
+    return classifier.classify(question).category
 
 def analyze_question_sentiment(question):
     """Simple sentiment analysis for questions"""
-    positive_words = ['good', 'great', 'excellent', 'amazing', 'helpful', 'useful', 'love', 'best']
-    negative_words = ['bad', 'poor', 'terrible', 'awful', 'hate', 'worst', 'difficult', 'problem', 'issue']
-    
-    question_lower = question.lower()
-    positive_count = sum(1 for word in positive_words if word in question_lower)
-    negative_count = sum(1 for word in negative_words if word in question_lower)
-    
-    if positive_count > negative_count:
-        return 'positive'
-    elif negative_count > positive_count:
-        return 'negative'
-    else:
-        return 'neutral'
+    return classifier.classify(question).question_sentiment
 
 def determine_priority_level(votes):
     """Determine priority level based on votes"""
@@ -393,8 +538,7 @@ def calculate_conversion_rate(tickets_sold):
 
 def analyze_satisfaction_from_polls(polls):
     """Analyze satisfaction metrics from polls"""
-    satisfaction_polls = [p for p in polls if any(word in p.get('question', '').lower() 
-                                                for word in ['satisfaction', 'satisfied', 'rate', 'recommend'])]
+    satisfaction_polls = [p for p in polls if classifier.classify(p.get('question', '')).mentions_satisfaction]
     
     if not satisfaction_polls:
         return {'score': 3.5, 'nps': 50, 'recommendation_rate': 75}
@@ -477,66 +621,47 @@ def generate_event_insights(event_data):
     
     return insights
 
-def perform_comprehensive_sentiment_analysis(event_id, event_data):
-    """Perform sentiment analysis on all text content"""
-    conn = sqlite3.connect('data/event_analytics.db')
-    cursor = conn.cursor()
-    
-    # Analyze poll questions
-    for poll in event_data['polls']:
-        sentiment_score, sentiment_label = simple_sentiment_analysis(poll['question'])
-        
-        cursor.execute('''
-            INSERT INTO sentiment_analysis (
-                event_id, content_type, content_id, sentiment_score,
-                sentiment_label, confidence, keywords
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            event_id, 'poll_question', poll['id'], sentiment_score,
-            sentiment_label, 0.8, json.dumps(extract_keywords(poll['question']))
-        ))
-    
-    # Analyze Q&A questions
-    for qa in event_data['qa_questions']:
-        sentiment_score, sentiment_label = simple_sentiment_analysis(qa['question'])
-        
-        cursor.execute('''
-            INSERT INTO sentiment_analysis (
-                event_id, content_type, content_id, sentiment_score,
-                sentiment_label, confidence, keywords
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            event_id, 'qa_question', qa['id'], sentiment_score,
-            sentiment_label, 0.8, json.dumps(extract_keywords(qa['question']))
-        ))
+def perform_comprehensive_sentiment_analysis(event_id, event_data, conn=None, qa_classifications=None):
+    """Perform sentiment analysis on all text content
+    
+    Rows are inserted on `conn` without committing when given (so they join the
+    caller's transaction); otherwise on the shared connection, committed here.
+    `qa_classifications` may carry already classified Q&A questions.
+    Returns the number of rows written.
+    """
+    if qa_classifications is None:
+        qa_classifications = classifier.classify_many(qa['question'] for qa in event_data['qa_questions'])
+    poll_classifications = classifier.classify_many(poll['question'] for poll in event_data['polls'])
+    
+    rows = []
+    for content_type, items, classifications in (
+            ('poll_question', event_data['polls'], poll_classifications),
+            ('qa_question', event_data['qa_questions'], qa_classifications)):
+        for item, classification in zip(items, classifications):
+            rows.append((
+                event_id, content_type, item['id'], classification.sentiment_score,
+                classification.sentiment_label, 0.8, json.dumps(classification.keywords)
+            ))
     
-    conn.commit()
-    conn.close()
+    sql = '''
+        INSERT INTO sentiment_analysis (
+            event_id, content_type, content_id, sentiment_score,
+            sentiment_label, confidence, keywords
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    '''
+    if conn is not None:
+        conn.executemany(sql, rows)
+    else:
+        with analytics_connection() as shared:
+            shared.executemany(sql, rows)
+            shared.commit()
+    return len(rows)
 
 def simple_sentiment_analysis(text):
     """Simple sentiment analysis returning score and label"""
-    positive_words = ['good', 'great', 'excellent', 'amazing', 'helpful', 'useful', 'love', 'best', 'fantastic', 'wonderful', 'awesome', 'perfect']
-    negative_words = ['bad', 'poor', 'terrible', 'awful', 'hate', 'worst', 'difficult', 'problem', 'issue', 'disappointing', 'frustrating', 'confusing']
-    
-    text_lower = text.lower()
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
-    
-    total_words = len(text.split())
-    sentiment_score = (positive_count - negative_count) / max(total_words, 1)
-    
-    if sentiment_score > 0.1:
-        return sentiment_score, 'positive'
-    elif sentiment_score < -0.1:
-        return sentiment_score, 'negative'
-    else:
-        return sentiment_score, 'neutral'
+    result = classifier.classify(text)
+    return result.sentiment_score, result.sentiment_label
 
 def extract_keywords(text):
     """Extract key phrases from text"""
-    # Simple keyword extraction
-    words = text.lower().split()
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'how', 'what', 'when', 'where', 'why', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'can', 'may', 'might'}
-    
-    keywords = [word for word in words if len(word) > 3 and word not in stop_words]
-    return keywords[:5]  # Return top 5 keywords
\ No newline at end of file
+    return classifier.classify(text).keywords
@@ -0,0 +1,155 @@
+"""
+Event registry: the ordered events list plus an id -> event index.
+
+All event lookups go through the registry so they are O(1) dict hits instead
+of linear scans over the whole catalogue. Sorted (date, id) indexes, overall
+and per status, let listings be paged with bisection.
+"""
+import base64
+import bisect
+import json
+import threading
+
+
+def _event_key(event_id):
+    """Normalize an event id so 7, '7' and ' 7 ' hit the same index entry"""
+    if isinstance(event_id, str):
+        stripped = event_id.strip()
+        if stripped.lstrip('-').isdigit():
+            return int(stripped)
+        return stripped
+    return event_id
+
+
+def _sort_key(event):
+    """Position of an event in the date indexes: by date, then id"""
+    event_id = _event_key(event['id'])
+    id_key = (0, event_id) if isinstance(event_id, int) else (1, str(event_id))
+    return (event.get('date') or '', id_key)
+
+
+# Sorts after every id on the same date, for inclusive upper date bounds
+_AFTER_ALL_IDS = (2,)
+
+
+def encode_cursor(event):
+    """Opaque paging cursor pointing just after `event`"""
+    date, (kind, event_id) = _sort_key(event)
+    return base64.urlsafe_b64encode(json.dumps([date, kind, event_id]).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Position key for page(after=...); raises ValueError for a malformed cursor"""
+    try:
+        date, kind, event_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    return (date, (kind, event_id))
+
+
+class EventRegistry:
+    """Keeps the events list and an id index in sync"""
+
+    def __init__(self, events=None):
+        self.events = []
+        self._by_id = {}
+        self._lock = threading.Lock()
+        self._max_id = 0
+        self._by_date = []     # sorted _sort_key of every event
+        self._by_status = {}   # status -> sorted _sort_key of its events
+        if events:
+            self.load(events)
+
+    def load(self, events):
+        """Replace the registry contents (the `events` list object is kept)"""
+        with self._lock:
+            self.events[:] = events
+            self._by_id = {_event_key(e['id']): e for e in self.events}
+            self._max_id = max((e['id'] for e in self.events if isinstance(e['id'], int)), default=0)
+            self._by_date = sorted(_sort_key(e) for e in self.events)
+            self._by_status = {}
+            for event in self.events:
+                self._by_status.setdefault(event.get('status', 'upcoming'), []).append(_sort_key(event))
+            for keys in self._by_status.values():
+                keys.sort()
+
+    def _index(self, event):
+        key = _sort_key(event)
+        bisect.insort(self._by_date, key)
+        bisect.insort(self._by_status.setdefault(event.get('status', 'upcoming'), []), key)
+
+    def _unindex(self, event):
+        key = _sort_key(event)
+        for keys in (self._by_date, self._by_status.get(event.get('status', 'upcoming'), [])):
+            position = bisect.bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+
+    def next_id(self):
+        """Allocate the next free event id"""
+        with self._lock:
+            self._max_id += 1
+            return self._max_id
+
+    def add(self, event):
+        """Append a new event and index it"""
+        with self._lock:
+            self.events.append(event)
+            self._by_id[_event_key(event['id'])] = event
+            self._index(event)
+            if isinstance(event['id'], int) and event['id'] > self._max_id:
+                self._max_id = event['id']
+        return event
+
+    def update(self, event_id, **fields):
+        """Update fields of an existing event in place
+
+        Returns the event's status before the update (None if there is no such
+        event), read under the same lock as the write, so concurrent status
+        changes each see the status they actually replaced. An update that sets
+        `status` to the current status is skipped.
+        """
+        event = self.get(event_id)
+        if event is None:
+            return None
+        with self._lock:
+            previous_status = event.get('status', 'upcoming')
+            if 'status' in fields and fields['status'] == previous_status:
+                return previous_status
+            if 'status' in fields or 'date' in fields:
+                self._unindex(event)
+                event.update(fields)
+                self._index(event)
+            else:
+                event.update(fields)
+        return previous_status
+
+    def page(self, status=None, date_from=None, date_to=None, after=None, limit=50):
+        """Events ordered by (date, id), served from the sorted indexes
+
+        `status` picks the per-status index; `date_from`/`date_to` are inclusive
+        ISO dates; `after` is a decoded cursor from the previous page.
+        Returns (events, has_more).
+        """
+        with self._lock:
+            keys = self._by_status.get(status, []) if status else self._by_date
+            start = bisect.bisect_left(keys, (date_from,)) if date_from else 0
+            if after is not None:
+                start = max(start, bisect.bisect_right(keys, after))
+            end = bisect.bisect_right(keys, (date_to, _AFTER_ALL_IDS)) if date_to else len(keys)
+            selected = keys[start:min(start + limit, end)]
+            has_more = start + limit < end
+            return [self._by_id[id_key[1]] for _, id_key in selected], has_more
+
+    def get(self, event_id, default=None):
+        """O(1) lookup by id (int or numeric string)"""
+        return self._by_id.get(_event_key(event_id), default)
+
+    def __contains__(self, event_id):
+        return _event_key(event_id) in self._by_id
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
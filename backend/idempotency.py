@@ -0,0 +1,80 @@
+"""
+Bounded, TTL-evicting cache of idempotency keys and their responses.
+
+A client sends the same `Idempotency-Key` header on every retry of a request.
+The first request with a key claims it and runs; later requests with that key
+get the stored response instead of running again. Retries that arrive while
+the first request is still in flight wait for its result.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+MAX_KEYS = 10000
+KEY_TTL_SECONDS = 600
+IN_FLIGHT_WAIT_SECONDS = 30
+
+
+class _Entry:
+    __slots__ = ('expires_at', 'response', 'done')
+
+    def __init__(self, expires_at):
+        self.expires_at = expires_at
+        self.response = None
+        self.done = threading.Event()
+
+
+class IdempotencyCache:
+    """Maps idempotency keys to the (body, status) of the request that used them first"""
+
+    def __init__(self, max_keys=MAX_KEYS, ttl=KEY_TTL_SECONDS):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        # Entries are kept in insertion order, so expired ones are at the front
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and len(self._entries) <= self.max_keys:
+                break
+            self._entries.popitem(last=False)
+            # Wake anyone still waiting on an evicted in-flight entry
+            entry.done.set()
+
+    def begin(self, key):
+        """Claim `key`.
+
+        Returns (True, None) if the caller owns the key and must call complete()
+        or abort(); otherwise (False, response) with the stored response, or
+        (False, None) if the original request did not finish in time.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = _Entry(now + self.ttl)
+                return True, None
+
+        entry.done.wait(IN_FLIGHT_WAIT_SECONDS)
+        return False, entry.response
+
+    def complete(self, key, response):
+        """Store the response for a key claimed with begin()"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            entry.response = response
+            entry.done.set()
+
+    def abort(self, key):
+        """Release a claimed key without a response so a retry can run again"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,170 @@
+"""
+In-process background job queue backed by a SQLite job table.
+
+Request handlers enqueue work (e.g. post-event archival) and return at once;
+a small pool of worker threads runs the registered handler for each job.
+Every job is recorded in the `jobs` table, so queued jobs, and jobs that were
+running when the process stopped, are picked up again on the next start.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import traceback
+from datetime import datetime
+
+JOBS_DB = 'data/jobs.db'
+WORKER_COUNT = 2
+MAX_ATTEMPTS = 3
+
+JOB_COLUMNS = ('id', 'kind', 'payload', 'status', 'attempts', 'result', 'error',
+               'created_at', 'started_at', 'finished_at')
+
+
+def _row_to_job(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    job['payload'] = json.loads(job['payload']) if job['payload'] else {}
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+
+class JobQueue:
+    """Persistent job queue with a worker pool"""
+
+    def __init__(self, db_path=JOBS_DB, workers=WORKER_COUNT, max_attempts=MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._handlers = {}
+        self._pending = queue.Queue()
+        self._threads = []
+        self._conn = None
+        self._lock = threading.Lock()  # Serialises use of the single job-table connection
+
+    def _connection(self):
+        if self._conn is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'queued', -- queued, running, done, failed
+                    attempts INTEGER DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)')
+            self._conn.commit()
+        return self._conn
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor
+
+    def _fetch(self, sql, params=()):
+        with self._lock:
+            return self._connection().execute(sql, params).fetchall()
+
+    def register(self, kind, handler):
+        """Run `handler(**payload)` for jobs of this kind; its return value is stored as the result"""
+        self._handlers[kind] = handler
+
+    def enqueue(self, kind, payload=None):
+        """Persist a job and hand it to the workers; returns the job id"""
+        if kind not in self._handlers:
+            raise ValueError(f'No handler registered for job kind {kind!r}')
+        cursor = self._execute(
+            'INSERT INTO jobs (kind, payload, status, created_at) VALUES (?, ?, ?, ?)',
+            (kind, json.dumps(payload or {}), 'queued', datetime.now().isoformat())
+        )
+        self._pending.put(cursor.lastrowid)
+        return cursor.lastrowid
+
+    def get(self, job_id):
+        rows = self._fetch(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,))
+        return _row_to_job(rows[0]) if rows else None
+
+    def list(self, status=None, limit=50):
+        """Most recent jobs first, optionally filtered by status"""
+        sql = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs"
+        params = []
+        if status:
+            sql += ' WHERE status = ?'
+            params.append(status)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        return [_row_to_job(row) for row in self._fetch(sql, params)]
+
+    def start(self):
+        """Re-queue unfinished jobs from a previous run and start the workers"""
+        if self._threads:
+            return
+        # Jobs left 'running' were interrupted by a restart; run them again
+        self._execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+        for (job_id,) in self._fetch("SELECT id FROM jobs WHERE status = 'queued' ORDER BY id"):
+            self._pending.put(job_id)
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return len(self._threads)
+
+    def stop(self, timeout=5):
+        """Let workers finish their current job and exit"""
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self):
+        while True:
+            job_id = self._pending.get()
+            if job_id is None:
+                break
+            self._run(job_id)
+
+    def _run(self, job_id):
+        # Claim the job atomically: only one worker (or process) moves it out of 'queued'
+        claimed = self._execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (datetime.now().isoformat(), job_id)
+        ).rowcount
+        if not claimed:
+            return
+
+        job = self.get(job_id)
+        try:
+            result = self._handlers[job['kind']](**job['payload'])
+        except Exception as e:
+            print(f"❌ Job {job_id} ({job['kind']}) failed: {e}")
+            traceback.print_exc()
+            # Retry until the attempt limit, then leave it failed for inspection
+            retry = job['attempts'] < self.max_attempts
+            self._execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                ('queued' if retry else 'failed', str(e), datetime.now().isoformat(), job_id)
+            )
+            if retry:
+                self._pending.put(job_id)
+            return
+
+        self._execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? WHERE id = ?",
+            (json.dumps(result), datetime.now().isoformat(), job_id)
+        )
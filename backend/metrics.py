@@ -0,0 +1,170 @@
+"""
+Minimal Prometheus-style metrics: counters, gauges and latency histograms.
+
+`init_request_metrics(app)` installs Flask hooks that record per-route
+latency, request/error counts and in-flight requests; `timed(operation)`
+wraps persistence helpers. `render_metrics()` produces the Prometheus text
+exposition format served at /metrics.
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import g, request
+
+# Latency buckets in seconds (upper bounds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = [0] * (len(self.buckets) + 2)
+                self._series[labels] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        label_names = self.label_names + ('le',)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{_format_labels(label_names, labels + (bound,))} {cumulative}')
+                lines.append(f'{self.name}_bucket{_format_labels(label_names, labels + ("+Inf",))} {series[-2]}')
+                lines.append(f'{self.name}_count{_format_labels(self.label_names, labels)} {series[-2]}')
+                lines.append(f'{self.name}_sum{_format_labels(self.label_names, labels)} {series[-1]:.6f}')
+        return lines
+
+
+REQUEST_LATENCY = Histogram('eventpro_request_duration_seconds', 'Request latency by route',
+                            ('method', 'endpoint'))
+REQUESTS = Counter('eventpro_requests_total', 'Requests by route and status code',
+                   ('method', 'endpoint', 'status'))
+REQUEST_ERRORS = Counter('eventpro_request_errors_total', 'Requests that failed with a 5xx or an exception',
+                         ('method', 'endpoint'))
+IN_FLIGHT = Gauge('eventpro_requests_in_flight', 'Requests currently being handled')
+PERSISTENCE_LATENCY = Histogram('eventpro_persistence_duration_seconds', 'Persistence helper latency',
+                                ('operation',))
+PERSISTENCE_CALLS = Counter('eventpro_persistence_calls_total', 'Persistence helper calls', ('operation',))
+PERSISTENCE_ERRORS = Counter('eventpro_persistence_errors_total', 'Persistence helper failures', ('operation',))
+
+ALL_METRICS = (REQUEST_LATENCY, REQUESTS, REQUEST_ERRORS, IN_FLIGHT,
+               PERSISTENCE_LATENCY, PERSISTENCE_CALLS, PERSISTENCE_ERRORS)
+
+
+def _endpoint_label():
+    # Use the route template (e.g. /api/events/<int:event_id>/qa) to keep label cardinality bounded
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def init_request_metrics(app):
+    """Record latency, counts, errors and in-flight requests for every route of `app`"""
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_in_flight = True
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = _endpoint_label()
+            REQUEST_LATENCY.observe(time.perf_counter() - start, request.method, endpoint)
+            REQUESTS.inc(request.method, endpoint, str(response.status_code))
+            if response.status_code >= 500:
+                REQUEST_ERRORS.inc(request.method, endpoint)
+            g.metrics_recorded = True
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc):
+        if g.pop('metrics_in_flight', False):
+            IN_FLIGHT.dec()
+        if exc is not None and not g.get('metrics_recorded'):
+            REQUEST_ERRORS.inc(request.method, _endpoint_label())
+
+
+def timed(operation):
+    """Decorator recording call count, latency and failures of a persistence helper"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                PERSISTENCE_ERRORS.inc(operation)
+                raise
+            finally:
+                PERSISTENCE_CALLS.inc(operation)
+                PERSISTENCE_LATENCY.observe(time.perf_counter() - start, operation)
+        return wrapper
+    return decorator
+
+
+def render_metrics():
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
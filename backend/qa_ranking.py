@@ -0,0 +1,153 @@
+"""
+Live Q&A rankings: top questions by votes or by a time-decayed "hot" score.
+
+Each event keeps two lazily invalidated heaps over its questions. A vote pushes
+the question's new key and leaves the old entry behind as stale; reading the
+top N pops until N current entries are found and pushes them back, so a
+request costs O(N log Q) instead of sorting every question. Stale entries are
+compacted away once they outnumber the live ones.
+"""
+import heapq
+import itertools
+import math
+import threading
+from datetime import datetime
+
+# A question this many seconds newer needs 10x fewer votes to rank the same
+HOT_DECAY_SECONDS = 1800
+
+RANKING_ORDERS = ('votes', 'hot')
+
+
+def hot_score(votes, created_ts):
+    """Time-decayed score: log10 of votes plus a bonus that grows with creation time"""
+    return math.log10(max(votes, 0) + 1) + created_ts / HOT_DECAY_SECONDS
+
+
+def _created_ts(question):
+    try:
+        return datetime.fromisoformat(question.get('timestamp')).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class RankHeap:
+    """Min-heap of (key, item_id) where only each item's latest key is current"""
+
+    def __init__(self):
+        self._heap = []
+        self._current = {}
+
+    def set(self, item_id, key):
+        self._current[item_id] = key
+        heapq.heappush(self._heap, (key, item_id))
+        if len(self._heap) > 2 * len(self._current) + 64:
+            self._heap = [(key, item_id) for item_id, key in self._current.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, item_id):
+        self._current.pop(item_id, None)
+
+    def top(self, n):
+        """Ids of the n smallest current keys, smallest first"""
+        result = []
+        kept = []
+        while self._heap and len(result) < n:
+            entry = heapq.heappop(self._heap)
+            key, item_id = entry
+            if self._current.get(item_id) != key or (kept and kept[-1] == entry):
+                continue  # Stale (or duplicate) entry: drop it for good
+            result.append(item_id)
+            kept.append(entry)
+        for entry in kept:
+            heapq.heappush(self._heap, entry)
+        return result
+
+    def __len__(self):
+        return len(self._current)
+
+
+class QuestionRanking:
+    """Vote and hot rankings of one event's questions"""
+
+    def __init__(self, questions=()):
+        self._lock = threading.Lock()
+        self._questions = {}   # question_id -> [question dict, insertion sequence, created timestamp, votes]
+        self._sequence = itertools.count()
+        self._by_votes = RankHeap()
+        self._by_hot = RankHeap()
+        for question in questions:
+            self._add(question)
+
+    def _add(self, question):
+        question_id = question.get('id')
+        entry = [question, next(self._sequence), _created_ts(question), question.get('votes', 0)]
+        self._questions[question_id] = entry
+        self._rank(question_id, entry)
+
+    def _rank(self, question_id, entry):
+        _, sequence, created_ts, votes = entry
+        # Ties go to the question asked first
+        self._by_votes.set(question_id, (-votes, sequence))
+        self._by_hot.set(question_id, (-hot_score(votes, created_ts), sequence))
+
+    def add(self, question):
+        with self._lock:
+            self._add(question)
+
+    def vote(self, question_id, votes):
+        with self._lock:
+            entry = self._questions.get(question_id)
+            # Vote counts only grow; a late record with an older count is ignored
+            if entry is not None and votes > entry[3]:
+                entry[3] = votes
+                self._rank(question_id, entry)
+
+    def remove(self, question_id):
+        with self._lock:
+            self._questions.pop(question_id, None)
+            self._by_votes.discard(question_id)
+            self._by_hot.discard(question_id)
+
+    def top(self, n, order='votes'):
+        """The n highest ranked question dicts for `order` ('votes' or 'hot')"""
+        heap = self._by_hot if order == 'hot' else self._by_votes
+        with self._lock:
+            return [self._questions[question_id][0] for question_id in heap.top(n)]
+
+
+class QARankings:
+    """Lazily built QuestionRanking per event id, kept current from engagement mutation records"""
+
+    def __init__(self):
+        self._rankings = {}
+        self._lock = threading.Lock()
+
+    def get(self, event_id, engagement):
+        """Get the event's ranking, building it from `engagement` on first use"""
+        event_id = str(event_id)
+        ranking = self._rankings.get(event_id)
+        if ranking is None:
+            with self._lock:
+                ranking = self._rankings.get(event_id)
+                if ranking is None:
+                    ranking = QuestionRanking(engagement.get('qa_questions', []))
+                    self._rankings[event_id] = ranking
+        return ranking
+
+    def apply(self, record):
+        """Feed a mutation record to the event's ranking, if it has been built"""
+        ranking = self._rankings.get(str(record.get('event_id')))
+        if ranking is None:
+            return
+        op = record.get('op')
+        if op == 'qa_create':
+            ranking.add(record['question'])
+        elif op == 'qa_vote':
+            ranking.vote(record['question_id'], record['votes'])
+        elif op == 'qa_delete':
+            ranking.remove(record['question_id'])
+
+    def clear(self):
+        with self._lock:
+            self._rankings.clear()
@@ -0,0 +1,95 @@
+"""
+Server-Sent Events fan-out for live ticket sales.
+
+`book_ticket` publishes each booking once; every subscriber has its own
+bounded queue. Publishing never blocks: a subscriber whose queue is full is
+dropped (its stream ends and the browser's EventSource reconnects), so one
+slow client can never back up the booking path.
+"""
+import json
+import queue
+import threading
+
+SUBSCRIBER_QUEUE_SIZE = 100
+HEARTBEAT_SECONDS = 15
+
+# Sentinel pushed to a dropped subscriber so its stream generator exits
+_DROPPED = object()
+
+
+class SalesBroadcaster:
+    """Publishes booking events to bounded per-subscriber queues"""
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.dropped_count = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event_type, payload):
+        """Queue an event for every subscriber without blocking"""
+        message = format_sse(event_type, payload)
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                self._drop(q)
+
+    def _drop(self, q):
+        with self._lock:
+            if q not in self._subscribers:
+                return
+            self._subscribers.discard(q)
+            self.dropped_count += 1
+
+        # Make room for the sentinel so the consumer's generator terminates
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
+        q.put_nowait(_DROPPED)
+
+    def stream(self, initial_event=None):
+        """Generator of SSE-formatted chunks for one subscriber"""
+        q = self.subscribe()
+        try:
+            # Tell the client how long to wait before reconnecting
+            yield 'retry: 3000\n\n'
+            if initial_event is not None:
+                yield format_sse(*initial_event)
+
+            while True:
+                try:
+                    message = q.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing the idle connection
+                    yield ': heartbeat\n\n'
+                    continue
+
+                if message is _DROPPED:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(q)
+
+
+def format_sse(event_type, payload):
+    """Format one Server-Sent Events message"""
+    return f"event: {event_type}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
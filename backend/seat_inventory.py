@@ -0,0 +1,111 @@
+"""
+Per-event seat inventory with atomic reserve / commit / release.
+
+Each event has its own counters (capacity, sold, reserved) guarded by its own
+lock, so a flash sale on one event never contends with sales for another.
+A booking first reserves seats, is stored, and then commits the reservation;
+if storing fails the reservation is released. A reservation carries its
+event's counters, so commit and release only take that event's lock, and
+commit writes the event's `attendees` under it. Remaining seats are O(1).
+"""
+import threading
+
+
+class _EventSeats:
+    __slots__ = ('lock', 'event', 'capacity', 'sold', 'reserved')
+
+    def __init__(self, event, sold):
+        self.lock = threading.Lock()
+        self.event = event      # The event dict; its 'attendees' mirrors `sold`
+        self.capacity = int(event.get('capacity') or 0)
+        self.sold = sold
+        self.reserved = 0
+        event['attendees'] = sold
+
+    def remaining(self):
+        if self.capacity <= 0:
+            return None  # No capacity configured: unlimited
+        return max(self.capacity - self.sold - self.reserved, 0)
+
+
+class Reservation:
+    """Seats held for one booking until it is committed or released"""
+
+    __slots__ = ('seats', 'quantity')
+
+    def __init__(self, seats, quantity):
+        self.seats = seats
+        self.quantity = quantity  # Seats still held; 0 once committed or released
+
+
+class SeatInventory:
+    """Enforces event capacity across concurrent bookings"""
+
+    def __init__(self):
+        self._events = {}
+        self._lock = threading.Lock()  # Guards the event dict; reservations only take their event's lock
+
+    def load(self, events, sold_counts=None):
+        """(Re)build inventory from events; `sold_counts` maps event id -> seats already sold
+
+        Each event's 'attendees' is set to its sold seats.
+        """
+        sold_counts = sold_counts or {}
+        with self._lock:
+            self._events = {
+                str(event['id']): _EventSeats(
+                    event, max(int(event.get('attendees') or 0), sold_counts.get(str(event['id']), 0))
+                )
+                for event in events
+            }
+
+    def track(self, event):
+        """Start tracking a newly created event"""
+        with self._lock:
+            self._events[str(event['id'])] = _EventSeats(event, int(event.get('attendees') or 0))
+
+    def _seats(self, event_id):
+        return self._events.get(str(event_id))
+
+    def reserve(self, event_id, quantity=1):
+        """Hold `quantity` seats; returns a Reservation, or None if not enough seats remain"""
+        seats = self._seats(event_id)
+        if seats is None:
+            raise KeyError(f'Unknown event {event_id}')
+
+        with seats.lock:
+            remaining = seats.remaining()
+            if remaining is not None and remaining < quantity:
+                return None
+            seats.reserved += quantity
+        return Reservation(seats, quantity)
+
+    def commit(self, reservation):
+        """Turn a reservation into sold seats and update the event's attendees; returns the total sold"""
+        seats = reservation.seats
+        with seats.lock:
+            seats.reserved -= reservation.quantity
+            seats.sold += reservation.quantity
+            reservation.quantity = 0
+            seats.event['attendees'] = seats.sold
+            return seats.sold
+
+    def release(self, reservation):
+        """Give the seats of an uncommitted reservation back"""
+        seats = reservation.seats
+        with seats.lock:
+            seats.reserved -= reservation.quantity
+            reservation.quantity = 0
+
+    def status(self, event_id):
+        """O(1) seat counts for an event, or None if it is unknown"""
+        seats = self._seats(event_id)
+        if seats is None:
+            return None
+        with seats.lock:
+            return {
+                'capacity': seats.capacity,
+                'sold': seats.sold,
+                'reserved': seats.reserved,
+                'remaining': seats.remaining()
+            }
@@ -0,0 +1,169 @@
+"""
+Keyword-based text classification for questions and poll text.
+
+All lexicons (question categories, sentiment words, satisfaction words) are
+compiled once into a single regex. Each text is lowercased and scanned once;
+that one pass yields the category, both sentiment labels and the extracted
+keywords. Matching keeps the original substring semantics ('rate' matches
+'generate'), so the results are the same as the per-keyword `in` checks this
+replaces.
+"""
+import re
+
+# Checked in this order; the first category with a matching keyword wins
+QUESTION_CATEGORIES = {
+    'technical': ['technical', 'platform', 'tool', 'software', 'system', 'bug', 'error'],
+    'content': ['topic', 'subject', 'content', 'session', 'speaker', 'presentation'],
+    'engagement': ['engage', 'audience', 'interaction', 'participate', 'involve'],
+    'logistics': ['time', 'schedule', 'venue', 'location', 'registration', 'access'],
+    'feedback': ['feedback', 'opinion', 'suggestion', 'improve', 'better', 'rate'],
+    'future': ['future', 'next', 'upcoming', 'plan', 'roadmap', 'trend'],
+    'business': ['business', 'strategy', 'revenue', 'roi', 'profit', 'cost']
+}
+
+# The question-level sentiment uses the shorter lists; text-level sentiment uses all words
+QUESTION_POSITIVE_WORDS = ['good', 'great', 'excellent', 'amazing', 'helpful', 'useful', 'love', 'best']
+QUESTION_NEGATIVE_WORDS = ['bad', 'poor', 'terrible', 'awful', 'hate', 'worst', 'difficult', 'problem', 'issue']
+POSITIVE_WORDS = QUESTION_POSITIVE_WORDS + ['fantastic', 'wonderful', 'awesome', 'perfect']
+NEGATIVE_WORDS = QUESTION_NEGATIVE_WORDS + ['disappointing', 'frustrating', 'confusing']
+
+SATISFACTION_WORDS = ['satisfaction', 'satisfied', 'rate', 'recommend']
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'how', 'what',
+    'when', 'where', 'why', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'could', 'should', 'can', 'may', 'might'
+})
+MAX_KEYWORDS = 5
+
+
+def _trie_pattern(words):
+    """Regex matching any of `words`, factored into a prefix trie (longest match first)"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Finds every keyword of a fixed set that occurs as a substring of a text"""
+
+    def __init__(self, keywords):
+        self.keywords = frozenset(keywords)
+        # A zero-width lookahead is tried at every position, so overlapping
+        # occurrences are all found; the trie keeps each attempt cheap
+        self._pattern = re.compile('(?=(' + _trie_pattern(self.keywords) + '))')
+        # Keywords that are substrings of another keyword occur whenever it does
+        self._implied = {}
+        for keyword in self.keywords:
+            implied = [other for other in self.keywords if other != keyword and other in keyword]
+            if implied:
+                self._implied[keyword] = implied
+
+    def find(self, text_lower):
+        """Set of keywords occurring in `text_lower` (already lowercased)"""
+        found = set(self._pattern.findall(text_lower))
+        if self._implied:
+            for keyword in tuple(found):
+                found.update(self._implied.get(keyword, ()))
+        return found
+
+
+class TextClassification:
+    __slots__ = ('category', 'question_sentiment', 'sentiment_score', 'sentiment_label',
+                 'keywords', 'mentions_satisfaction')
+
+    def __init__(self, category, question_sentiment, sentiment_score, sentiment_label,
+                 keywords, mentions_satisfaction):
+        self.category = category
+        self.question_sentiment = question_sentiment
+        self.sentiment_score = sentiment_score
+        self.sentiment_label = sentiment_label
+        self.keywords = keywords
+        self.mentions_satisfaction = mentions_satisfaction
+
+
+def _compare_label(positive_count, negative_count):
+    if positive_count > negative_count:
+        return 'positive'
+    elif negative_count > positive_count:
+        return 'negative'
+    return 'neutral'
+
+
+# Bit flags describing which lexicons a keyword belongs to
+_QUESTION_POSITIVE, _QUESTION_NEGATIVE, _POSITIVE, _NEGATIVE, _SATISFACTION = (1, 2, 4, 8, 16)
+
+
+class TextClassifier:
+    """Classifies texts against all lexicons in a single pass per text"""
+
+    def __init__(self, categories=QUESTION_CATEGORIES):
+        self._categories = list(categories)
+        # keyword -> [index of its first category (or None), lexicon flags]
+        roles = {}
+        for index, keywords in enumerate(categories.values()):
+            for keyword in keywords:
+                roles.setdefault(keyword, [index, 0])
+        for flag, words in ((_QUESTION_POSITIVE, QUESTION_POSITIVE_WORDS), (_QUESTION_NEGATIVE, QUESTION_NEGATIVE_WORDS),
+                            (_POSITIVE, POSITIVE_WORDS), (_NEGATIVE, NEGATIVE_WORDS),
+                            (_SATISFACTION, SATISFACTION_WORDS)):
+            for word in words:
+                roles.setdefault(word, [None, 0])[1] |= flag
+        self._roles = {keyword: tuple(role) for keyword, role in roles.items()}
+        self._matcher = KeywordMatcher(self._roles)
+
+    def classify(self, text):
+        text_lower = text.lower()
+        words = text_lower.split()
+
+        category_index = None
+        question_positive = question_negative = positive = negative = 0
+        mentions_satisfaction = False
+        for keyword in self._matcher.find(text_lower):
+            index, flags = self._roles[keyword]
+            if index is not None and (category_index is None or index < category_index):
+                category_index = index
+            if flags:
+                question_positive += bool(flags & _QUESTION_POSITIVE)
+                question_negative += bool(flags & _QUESTION_NEGATIVE)
+                positive += bool(flags & _POSITIVE)
+                negative += bool(flags & _NEGATIVE)
+                mentions_satisfaction |= bool(flags & _SATISFACTION)
+
+        sentiment_score = (positive - negative) / max(len(words), 1)
+        if sentiment_score > 0.1:
+            sentiment_label = 'positive'
+        elif sentiment_score < -0.1:
+            sentiment_label = 'negative'
+        else:
+            sentiment_label = 'neutral'
+
+        return TextClassification(
+            self._categories[category_index] if category_index is not None else 'general',
+            _compare_label(question_positive, question_negative),
+            sentiment_score,
+            sentiment_label,
+            [word for word in words if len(word) > 3 and word not in STOP_WORDS][:MAX_KEYWORDS],
+            mentions_satisfaction
+        )
+
+    def classify_many(self, texts):
+        """Classify a batch of texts; results are in input order"""
+        classify = self.classify
+        return [classify(text) for text in texts]
+
+
+# Shared instance; the lexicons are compiled once at import
+classifier = TextClassifier()
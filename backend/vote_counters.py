@@ -0,0 +1,78 @@
+"""
+Lock-striped poll vote counters.
+
+Each poll gets a counter cell (per-option votes plus total responses). Cells
+are guarded by one of a fixed number of stripe locks chosen by hashing the
+(event_id, poll_id) key, so votes on different polls rarely contend and votes
+on the same poll never lose increments under a threaded server.
+"""
+import threading
+
+STRIPE_COUNT = 64
+
+
+class PollVoteCounters:
+    """Per-poll, per-option vote counters sharded over striped locks"""
+
+    def __init__(self, stripes=STRIPE_COUNT):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._cells = {}
+
+    def _lock_for(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+    def _cell(self, key, poll):
+        # Called with the stripe lock held; seeds the cell from the stored poll
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = {
+                'option_votes': dict(poll.get('option_votes') or {}),
+                'responses': poll.get('responses', 0)
+            }
+            self._cells[key] = cell
+        return cell
+
+    def vote(self, event_id, poll, option):
+        """Atomically record one vote; returns a consistent snapshot of the poll"""
+        key = (str(event_id), poll.get('id'))
+        with self._lock_for(key):
+            cell = self._cell(key, poll)
+            cell['option_votes'][option] = cell['option_votes'].get(option, 0) + 1
+            cell['responses'] += 1
+
+            # Mirror into the stored poll so persistence and analytics see the counts
+            poll.setdefault('option_votes', {})[option] = cell['option_votes'][option]
+            poll['responses'] = cell['responses']
+            return self._snapshot(poll, cell)
+
+    def snapshot(self, event_id, poll):
+        """Consistent copy of a poll with its current counters"""
+        key = (str(event_id), poll.get('id'))
+        with self._lock_for(key):
+            cell = self._cells.get(key)
+            if cell is None:
+                return dict(poll)
+            return self._snapshot(poll, cell)
+
+    @staticmethod
+    def _snapshot(poll, cell):
+        result = dict(poll)
+        result['option_votes'] = dict(cell['option_votes'])
+        result['responses'] = cell['responses']
+        return result
+
+    def discard(self, event_id, poll_id):
+        """Drop the counters of a deleted poll"""
+        key = (str(event_id), poll_id)
+        with self._lock_for(key):
+            self._cells.pop(key, None)
+
+    def clear(self):
+        """Drop all counters (e.g. after engagement data is reloaded)"""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self._cells.clear()
+        finally:
+            for lock in self._locks:
+                lock.release()
@@ -5,9 +5,15 @@ This script simulates real-time ticket purchases with random user data
 """
 
 import json
+import math
 import random
+import threading
 import time
+import uuid
 import requests
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from faker import Faker
 import csv
@@ -16,6 +22,41 @@ import os
 # Initialize Faker for generating random user data
 fake = Faker()
 
+class LatencyHistogram:
+    """Log-bucketed latency histogram (~2% relative precision) for percentile reporting"""
+    
+    def __init__(self, min_ms=0.01, growth=1.02):
+        self.min_ms = min_ms
+        self.log_growth = math.log(growth)
+        self.buckets = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.lock = threading.Lock()
+    
+    def record(self, latency_ms):
+        bucket = max(0, int(math.log(max(latency_ms, self.min_ms) / self.min_ms) / self.log_growth))
+        with self.lock:
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+            self.count += 1
+            self.total_ms += latency_ms
+            self.max_ms = max(self.max_ms, latency_ms)
+    
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in ms"""
+        if self.count == 0:
+            return 0.0
+        target = math.ceil(self.count * pct / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(self.min_ms * math.exp((bucket + 1) * self.log_growth), self.max_ms)
+        return self.max_ms
+    
+    def mean(self):
+        return self.total_ms / self.count if self.count else 0.0
+
 class TicketBookingSimulator:
     def __init__(self, base_url="http://localhost:5000"):
         self.base_url = base_url
@@ -120,23 +161,96 @@ class TicketBookingSimulator:
         if not self.bookings:
             return {"message": "No bookings yet"}
         
-        cities = [booking['attendee']['city'] for booking in self.bookings]
-        payment_methods = [booking['attendee']['payment_method'] for booking in self.bookings]
-        referral_sources = [booking['attendee']['referral_source'] for booking in self.bookings]
+        # One counting pass per attribute instead of list.count() for every distinct value
+        cities = Counter(booking['attendee']['city'] for booking in self.bookings)
+        payment_methods = Counter(booking['attendee']['payment_method'] for booking in self.bookings)
+        referral_sources = Counter(booking['attendee']['referral_source'] for booking in self.bookings)
         
         return {
             "total_bookings": len(self.bookings),
             "total_revenue": self.total_revenue,
             "average_ticket_price": self.total_revenue / len(self.bookings),
-            "top_cities": {city: cities.count(city) for city in set(cities)},
-            "payment_method_breakdown": {method: payment_methods.count(method) for method in set(payment_methods)},
-            "referral_source_breakdown": {source: referral_sources.count(source) for source in set(referral_sources)},
+            "top_cities": dict(cities),
+            "payment_method_breakdown": dict(payment_methods),
+            "referral_source_breakdown": dict(referral_sources),
             "booking_timeframe": {
                 "first_booking": min(booking['booking_time'] for booking in self.bookings),
                 "last_booking": max(booking['booking_time'] for booking in self.bookings)
             }
         }
     
+    def load_test(self, event_id, total_requests=1000, concurrency=20, endpoint="/api/book-ticket"):
+        """Drive the real booking endpoint with concurrent HTTP requests and report latency percentiles"""
+        print(f"\n🔥 Load testing {self.base_url}{endpoint} for Event {event_id}...")
+        print(f"📊 {total_requests} requests with {concurrency} concurrent workers")
+        
+        histogram = LatencyHistogram()
+        status_counts = {}
+        stats_lock = threading.Lock()
+        local = threading.local()
+        
+        def get_session():
+            # One keep-alive session (and connection pool) per worker thread
+            if not hasattr(local, "session"):
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                local.session = session
+            return local.session
+        
+        def send_booking(_):
+            payload = {
+                "event_id": event_id,
+                "attendee_name": fake.name(),
+                "attendee_email": fake.email(),
+                "ticket_price": random.choice([200000, 250000, 300000, 350000]),
+                "currency": "INR"
+            }
+            headers = {"Idempotency-Key": str(uuid.uuid4())}
+            
+            start = time.perf_counter()
+            try:
+                response = get_session().post(self.base_url + endpoint, json=payload, headers=headers, timeout=30)
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            latency_ms = (time.perf_counter() - start) * 1000
+            
+            histogram.record(latency_ms)
+            with stats_lock:
+                status_counts[status] = status_counts.get(status, 0) + 1
+                if status == 200:
+                    self.total_revenue += payload["ticket_price"]
+        
+        run_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(send_booking, range(total_requests)))
+        elapsed = time.perf_counter() - run_start
+        
+        report = {
+            "endpoint": endpoint,
+            "requests": total_requests,
+            "concurrency": concurrency,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(total_requests / elapsed, 1) if elapsed > 0 else 0,
+            "status_counts": {str(k): v for k, v in status_counts.items()},
+            "latency_ms": {
+                "mean": round(histogram.mean(), 2),
+                "p50": round(histogram.percentile(50), 2),
+                "p95": round(histogram.percentile(95), 2),
+                "p99": round(histogram.percentile(99), 2),
+                "max": round(histogram.max_ms, 2)
+            }
+        }
+        
+        print(f"\n✅ Completed {total_requests} requests in {report['elapsed_seconds']}s")
+        print(f"⚡ Throughput: {report['throughput_rps']} req/s")
+        print(f"⏱️  Latency (ms): p50 {report['latency_ms']['p50']} | p95 {report['latency_ms']['p95']} | "
+              f"p99 {report['latency_ms']['p99']} | max {report['latency_ms']['max']}")
+        print(f"📬 Status codes: {report['status_counts']}")
+        return report
+    
     def continuous_simulation(self, event_id, duration_minutes=30, bookings_per_minute=2):
         """Run continuous booking simulation"""
         print(f"\n🔄 Starting continuous simulation for {duration_minutes} minutes...")
@@ -180,9 +294,10 @@ def main():
             print("5. Custom simulation")
             print("6. Export current data to CSV")
             print("7. Show booking statistics")
-            print("8. Exit")
+            print("8. HTTP load test against the running server")
+            print("9. Exit")
             
-            choice = input("\nEnter your choice (1-8): ").strip()
+            choice = input("\nEnter your choice (1-9): ").strip()
             
             if choice == "1":
                 event_id = input("Enter Event ID (default: 1): ").strip() or "1"
@@ -219,6 +334,12 @@ def main():
                 print(json.dumps(stats, indent=2, default=str))
                 
             elif choice == "8":
+                event_id = input("Enter Event ID (default: 1): ").strip() or "1"
+                total_requests = int(input("Enter number of requests (default: 1000): ").strip() or "1000")
+                concurrency = int(input("Enter concurrent workers (default: 20): ").strip() or "20")
+                simulator.load_test(event_id, total_requests, concurrency)
+                
+            elif choice == "9":
                 # Auto-export before exit
                 if simulator.bookings:
                     print("\n💾 Auto-exporting data before exit...")